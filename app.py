@@ -6,12 +6,16 @@ Web interface for CV analysis with multiple input methods.
 import streamlit as st
 import io
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 try:
     from cv_analyzer import CVAnalyzer
 except ImportError as e:
     raise
 from psychometric_assessment import PsychometricAssessment
+from pdf_extractor import PYMUPDF_AVAILABLE, extract_pdf_text
 try:
     # Try importing pypdf (new package name) first
     import pypdf as PyPDF2
@@ -20,16 +24,38 @@ except ImportError:
     try:
         import PyPDF2
     except ImportError as e:
-        st.error("❌ PDF library not found. Please run: pip install pypdf")
-        raise
-from docx import Document
-import google.generativeai as genai
+        if not PYMUPDF_AVAILABLE:
+            st.error("❌ PDF library not found. Please run: pip install pymupdf")
+            raise
+        PyPDF2 = None
+# python-docx and google.generativeai are imported where they are used, so cold starts and
+# reruns that never parse a DOCX or call Gemini skip loading them
 import os
+import asyncio
+import hashlib
+import hmac
 import json
+try:
+    # orjson is considerably faster for the multi-KB Gemini payloads
+    import orjson
+except ImportError:
+    orjson = None
 import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
 import streamlit_authenticator as stauth
-from datetime import datetime
+import bcrypt
+try:
+    # argon2id is the hash for new and migrated passwords; bcrypt hashes are still verified
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:
+    PasswordHasher = None
+from datetime import datetime, timezone
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
 
 # IMPORTANT: st.set_page_config must be the very first Streamlit command
 st.set_page_config(
@@ -38,54 +64,146 @@ st.set_page_config(
     layout="wide"
 )
 
-def extract_text_from_pdf(uploaded_file) -> str:
-    """Extract text from uploaded PDF file."""
+# Stored timestamps are timezone-aware UTC so Supabase doesn't have to coerce naive values
+_UTC = timezone.utc
+
+# Patterns are compiled once at module level instead of on every call
+_JOB_TITLE_RES = [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+    r'(?:Job Title|Position|Role):\s*([^\n]+)',
+    r'(?:We are|We\'re) (?:looking for|seeking|hiring) (?:a|an)?\s*([A-Z][a-zA-Z\s&]+?)(?:\s+(?:to|who|with|at))',
+    r'^([A-Z][a-zA-Z\s&]+?)\s+(?:at|with|for)',
+)]
+_COMPANY_URL_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'/(?:company|jobs|careers)/([^/]+)',
+    r'@([^/]+)',
+    r'company=([^&]+)',
+)]
+_COMPANY_DESC_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'(?:at|with|from)\s+([A-Z][a-zA-Z\s&]+?)(?:\s+(?:is|are|seeks|looking))',
+    r'([A-Z][a-zA-Z\s&]+?)\s+(?:is|are)\s+(?:looking|seeking)',
+    r'About\s+([A-Z][a-zA-Z\s&]+?)(?:\.|,|\n)',
+)]
+# Whitespace runs, collapsed to single spaces in scraped page text
+_WS_RE = re.compile(r'\s+')
+_JOB_CONTENT_CLASS_RE = re.compile(r'(description|job|content|posting)', re.IGNORECASE)
+# Line breaks (with surrounding blank space) and runs of spaces/tabs, for compacting prompt text
+_NEWLINES_RE = re.compile(r'\s*\n\s*')
+_HSPACE_RE = re.compile(r'[^\S\n]+')
+
+
+def _json_dumps(obj) -> str:
+    """Serialize to a JSON string (Supabase REST needs str), using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+def _json_loads(text):
+    """Parse JSON text, using orjson when available. Errors subclass json.JSONDecodeError."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def extract_text_from_pdf(data: bytes) -> str:
+    """Extract text from uploaded PDF bytes. Cached by file content so re-uploads are free."""
     try:
-        pdf_reader = PyPDF2.PdfReader(uploaded_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        if PYMUPDF_AVAILABLE:
+            return extract_pdf_text(data)
+        
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        return "\n".join(page.extract_text() for page in pdf_reader.pages)
     except Exception as e:
         st.error(f"Error extracting text from PDF: {str(e)}")
         return ""
 
 
-def extract_text_from_docx(uploaded_file) -> str:
-    """Extract text from uploaded DOCX file."""
+@st.cache_data(max_entries=32, show_spinner=False)
+def extract_text_from_docx(data: bytes) -> str:
+    """Extract text from uploaded DOCX bytes. Cached by file content so re-uploads are free."""
     try:
-        doc = Document(uploaded_file)
-        text = "\n".join([para.text for para in doc.paragraphs])
+        from docx import Document
+        
+        doc = Document(io.BytesIO(data))
+        text = "\n".join(para.text for para in doc.paragraphs if para.text.strip())
         return text
     except Exception as e:
         st.error(f"Error extracting text from DOCX: {str(e)}")
         return ""
 
 
+_DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def extract_cv_text(uploaded_file) -> str:
+    """Extract text from an uploaded CV, reading its bytes once and dispatching on type or extension."""
+    # Reruns with the same upload reuse the text without re-hashing the file for the cache lookup
+    file_id = getattr(uploaded_file, 'file_id', None)
+    last_upload = st.session_state.get('_cv_upload')
+    if file_id and last_upload and last_upload[0] == file_id:
+        return last_upload[1]
+    
+    data = uploaded_file.getvalue()
+    name = (uploaded_file.name or "").lower()
+    if uploaded_file.type == "application/pdf" or name.endswith('.pdf'):
+        text = extract_text_from_pdf(data)
+    elif uploaded_file.type == _DOCX_MIME_TYPE or name.endswith('.docx'):
+        text = extract_text_from_docx(data)
+    else:
+        text = ""
+    
+    if file_id:
+        st.session_state['_cv_upload'] = (file_id, text)
+    return text
+
+
+@st.cache_resource
+def _get_http_session() -> requests.Session:
+    """Return a pooled HTTP session shared across reruns so connections are reused."""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        # Only advertise encodings urllib3 can actually decode in this environment
+        'Accept-Encoding': ACCEPT_ENCODING,
+    })
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _fetch_url_text(url: str) -> str:
+    """
+    Fetch a job listing URL and return its text.
+    Cached for an hour; errors propagate so failed fetches are not cached.
+    """
+    response = _get_http_session().get(url, timeout=10)
+    response.raise_for_status()
+    
+    # Only build the tree for likely job content; fall back to the full page if nothing matched
+    strainer = SoupStrainer(['main', 'article', 'div'], attrs={'class': _JOB_CONTENT_CLASS_RE})
+    soup = BeautifulSoup(response.content, 'lxml', parse_only=strainer)
+    if not soup.get_text(strip=True):
+        soup = BeautifulSoup(response.content, 'lxml')
+    
+    # Remove script, style and other non-content elements
+    for element in soup(["script", "style", "noscript", "svg"]):
+        element.decompose()
+    
+    # Get text content and collapse whitespace in a single pass
+    return _WS_RE.sub(' ', soup.get_text(' ')).strip()
+
+
 def extract_text_from_url(url: str) -> str:
     """Extract text from a job listing URL."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text content
-        text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text
+        return _fetch_url_text(url)
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching URL: {str(e)}")
         return ""
@@ -103,74 +221,51 @@ def calculate_potential_match_score(gemini_analysis: dict) -> int:
     cv_improvements = gemini_analysis.get('cv_improvements', [])
     power_word_swaps = gemini_analysis.get('power_word_swaps', [])
     
-    # Calculate potential improvement
-    improvement = 0
-    
-    # Missing skills impact (each missing skill addressed = 2-3 points)
-    if missing_skills:
-        # If user addresses missing skills, they can gain points
-        # Assume addressing 50% of missing skills improves score
-        improvement += min(len(missing_skills) * 2, 15)  # Max 15 points from skills
-    
-    # CV improvements impact (each improvement = 1-2 points)
-    if cv_improvements:
-        improvement += min(len(cv_improvements) * 1.5, 10)  # Max 10 points from improvements
+    if not (missing_skills or cv_improvements or power_word_swaps):
+        return int(current_score)
     
-    # Power word swaps impact (smaller impact, but adds professionalism)
-    if power_word_swaps:
-        improvement += min(len(power_word_swaps) * 0.5, 5)  # Max 5 points from power words
+    # Work in half points so the 1.5 and 0.5 weights stay integral
+    # Missing skills: 2 points each, max 15 (addressing them is the biggest gain)
+    # CV improvements: 1.5 points each, max 10
+    # Power word swaps: 0.5 points each, max 5 (smaller impact, but adds professionalism)
+    half_points = min(len(missing_skills) * 4, 30) + min(len(cv_improvements) * 3, 20) + min(len(power_word_swaps), 10)
     
     # Calculate potential score (capped at 100)
-    potential_score = min(current_score + improvement, 100)
-    
-    # Ensure potential is always at least slightly higher than current (if there are suggestions)
-    if (missing_skills or cv_improvements or power_word_swaps) and potential_score <= current_score:
-        potential_score = min(current_score + 5, 100)
-    
-    return int(round(potential_score))
+    return int(round(min(current_score + half_points / 2, 100)))
 
 
+@st.cache_data(max_entries=64, show_spinner=False)
 def extract_job_title(job_description: str) -> str:
-    """Extract job title from job description."""
+    """Extract job title from job description. Memoised since it runs on every analysis render and save."""
     if not job_description:
         return "Untitled Position"
     
     # Look for common patterns
-    patterns = [
-        r'(?:Job Title|Position|Role):\s*([^\n]+)',
-        r'(?:We are|We\'re) (?:looking for|seeking|hiring) (?:a|an)?\s*([A-Z][a-zA-Z\s&]+?)(?:\s+(?:to|who|with|at))',
-        r'^([A-Z][a-zA-Z\s&]+?)\s+(?:at|with|for)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, job_description, re.IGNORECASE | re.MULTILINE)
+    for pattern in _JOB_TITLE_RES:
+        match = pattern.search(job_description)
         if match:
             title = match.group(1).strip()
             if len(title) < 100:  # Reasonable title length
                 return title
     
     # Fallback: use first line or first 50 chars
-    first_line = job_description.split('\n')[0].strip()
+    first_line = job_description.partition('\n')[0].strip()
     if first_line and len(first_line) < 100:
         return first_line[:50]
     
     return "Untitled Position"
 
 
+@st.cache_data(max_entries=64, show_spinner=False)
 def extract_company_name(job_url: str, job_description: str) -> str:
-    """Extract company name from job URL or job description."""
+    """Extract company name from job URL or job description. Memoised like extract_job_title."""
     company_name = ""
     
     # Try to extract from URL
     if job_url:
         # Common patterns in job URLs
-        patterns = [
-            r'/(?:company|jobs|careers)/([^/]+)',
-            r'@([^/]+)',
-            r'company=([^&]+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, job_url, re.IGNORECASE)
+        for pattern in _COMPANY_URL_RES:
+            match = pattern.search(job_url)
             if match:
                 company_name = match.group(1).replace('-', ' ').title()
                 break
@@ -178,13 +273,8 @@ def extract_company_name(job_url: str, job_description: str) -> str:
     # If not found in URL, try to extract from job description
     if not company_name and job_description:
         # Look for common patterns like "About [Company]" or "[Company] is looking for"
-        patterns = [
-            r'(?:at|with|from)\s+([A-Z][a-zA-Z\s&]+?)(?:\s+(?:is|are|seeks|looking))',
-            r'([A-Z][a-zA-Z\s&]+?)\s+(?:is|are)\s+(?:looking|seeking)',
-            r'About\s+([A-Z][a-zA-Z\s&]+?)(?:\.|,|\n)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, job_description, re.IGNORECASE)
+        for pattern in _COMPANY_DESC_RES:
+            match = pattern.search(job_description)
             if match:
                 potential_name = match.group(1).strip()
                 # Filter out common false positives
@@ -195,27 +285,210 @@ def extract_company_name(job_url: str, job_description: str) -> str:
     return company_name.strip() if company_name else "the company"
 
 
-def get_company_research(company_name: str, job_url: str = "", job_description: str = "") -> dict:
-    """Get company research from Gemini AI."""
+class _JsonObjectTracker:
+    """Tracks brace depth across streamed chunks to find where the first JSON object ends."""
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, chunk: str) -> int:
+        """Return the index just past the object's closing brace in chunk, or -1 if it is still open."""
+        for i, char in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                # Quotes only matter once we're inside the object
+                self.in_string = self.started
+            elif char == '{':
+                self.depth += 1
+                self.started = True
+            elif char == '}' and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
+def _close_stream(response):
+    """
+    Stop a streaming Gemini response early, releasing its connection instead of leaving it open until
+    garbage collection. The SDK exposes no public close, so this reaches the underlying iterator:
+    a gRPC call is cancelled, a REST chunk generator is closed.
+    """
+    iterator = getattr(response, '_iterator', None)
+    if iterator is None:
+        return
     try:
+        if hasattr(iterator, 'cancel'):
+            iterator.cancel()
+        elif hasattr(iterator, 'close'):
+            iterator.close()
+    except Exception:
+        pass
+
+
+def _stream_until_json_complete(response):
+    """Yield response text until the JSON object closes, dropping any trailing commentary, then close the stream."""
+    tracker = _JsonObjectTracker()
+    try:
+        for chunk in response:
+            if chunk.text:
+                end = tracker.feed(chunk.text)
+                if end != -1:
+                    yield chunk.text[:end]
+                    return
+                yield chunk.text
+    finally:
+        _close_stream(response)
+
+
+def _extract_json(text: str) -> str:
+    """
+    Slice the first complete JSON object out of text, e.g. from inside a markdown code fence.
+    One linear scan that respects strings and escapes; returns text unchanged if there is no object.
+    """
+    start = text.find('{')
+    if start == -1:
+        return text
+    end = _JsonObjectTracker().feed(text[start:])
+    if end == -1:
+        # Unterminated object: let the JSON parser report where it breaks
+        return text[start:]
+    return text[start:start + end]
+
+
+def _parse_json_response(response_text: str) -> dict:
+    """Parse the JSON object from a Gemini response."""
+    return _json_loads(_extract_json(response_text))
+
+
+_STREAM_DONE = object()
+
+
+async def _drain_stream(stream, placeholder) -> str:
+    """Consume a blocking text stream in a worker thread, rendering the text so far into placeholder."""
+    text = ""
+    while True:
+        # Each blocking next() runs off the event loop so the other streams keep flowing
+        chunk = await asyncio.to_thread(next, stream, _STREAM_DONE)
+        if chunk is _STREAM_DONE:
+            return text
+        text += chunk
+        placeholder.markdown(text)
+
+
+async def _gather_streams(streams: list, placeholders: list) -> list:
+    # A failing stream must not cancel or discard the others, so its exception is returned in its slot
+    return await asyncio.gather(
+        *(_drain_stream(stream, placeholder) for stream, placeholder in zip(streams, placeholders)),
+        return_exceptions=True
+    )
+
+
+def write_streams_concurrently(streams: list, placeholders: list) -> list:
+    """
+    Run several Gemini streams at once, rendering each into its placeholder.
+    Returns the full texts in order; a stream that raised leaves its exception in place of its text.
+    The streams' next() calls run in worker threads, so they must not touch st.secrets or st.cache_resource.
+    """
+    return asyncio.run(_gather_streams(streams, placeholders))
+
+
+# Completed Gemini outputs are reused for identical inputs; bump the version when a prompt changes
+GEMINI_PROMPT_VERSION = "1"
+GEMINI_RESPONSE_CACHE_SIZE = 256
+GEMINI_RESPONSE_TTL = 86400  # seconds
+
+
+class _ResponseCache:
+    """Thread-safe LRU of recent Gemini outputs, keyed by an input digest and expiring after ttl seconds."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def get_gemini_response_cache() -> _ResponseCache:
+    """Process-wide Gemini output cache, shared by all sessions."""
+    return _ResponseCache(GEMINI_RESPONSE_CACHE_SIZE, GEMINI_RESPONSE_TTL)
+
+
+def gemini_inputs_key(*parts: str) -> str:
+    """Digest of the prompt inputs, so the cache never holds the CV or job text as keys."""
+    digest = hashlib.blake2b(GEMINI_PROMPT_VERSION.encode('utf-8'), digest_size=20)
+    for part in parts:
+        digest.update(b'\0')
+        digest.update((part or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+# JSON mode: Gemini emits the bare object, without code fences or commentary tokens around it
+_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+
+@st.cache_resource
+def _get_gemini_model(api_key: str):
+    """Configure Gemini and return a model shared across reruns."""
+    import google.generativeai as genai
+    
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+
+def _stream_company_research(company_name: str, job_url: str = "", job_description: str = "", model=None):
+    """
+    Generator function that streams Gemini company research response.
+    Pass model when the generator is iterated off the script thread, where st.secrets and
+    st.cache_resource are unavailable; otherwise it is resolved on the first next().
+    """
+    if model is None:
         # Get API key from environment or Streamlit secrets
         api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
         
         if not api_key:
-            return {"error": "Google API key not found. Please set GEMINI_API_KEY environment variable or add it to Streamlit secrets."}
-        
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+            yield "Error: Google API key not found."
+            return
         
-        # Create the prompt
-        context_info = ""
-        if job_url:
-            context_info += f"\nJob URL: {job_url}"
-        if job_description:
-            context_info += f"\nJob Description (first 500 chars): {job_description[:500]}"
-        
-        prompt = f"""Research the following company and provide comprehensive intelligence for a job interview candidate.
+        model = _get_gemini_model(api_key)
+    
+    # Create the prompt
+    context_info = ""
+    if job_url:
+        context_info += f"\nJob URL: {job_url}"
+    if job_description:
+        context_info += f"\nJob Description (first 500 chars): {_compact_prompt_text(job_description, RESEARCH_MAX_JD_CHARS)}"
+    
+    prompt = f"""Research the following company and provide comprehensive intelligence for a job interview candidate.
 
 Company Name: {company_name}
 {context_info}
@@ -260,59 +533,52 @@ IMPORTANT:
 - For financial performance, estimate based on available public information
 - For interview deep-dive items, be specific about what to look for (e.g., "Check their 'About Us' page for their mission statement and note their core values")
 - Return ONLY valid JSON. Do not include any text before or after the JSON."""
+    
+    # Generate response with streaming
+    response = model.generate_content(prompt, generation_config=_JSON_GENERATION_CONFIG, stream=True)
+    
+    # Yield chunks as they arrive, stopping once the JSON object is complete
+    yield from _stream_until_json_complete(response)
+
+
+def get_company_research(company_name: str, job_url: str = "", job_description: str = "") -> dict:
+    """Get company research from Gemini AI."""
+    try:
+        # Get API key from environment or Streamlit secrets
+        api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
         
-        # Generate response with streaming
-        response = model.generate_content(prompt, stream=True)
+        if not api_key:
+            return {"error": "Google API key not found. Please set GEMINI_API_KEY environment variable or add it to Streamlit secrets."}
         
         # Collect full response while streaming
-        response_text = ""
-        for chunk in response:
-            if chunk.text:
-                response_text += chunk.text
-        
-        response_text = response_text.strip()
+        response_text = "".join(_stream_company_research(company_name, job_url, job_description))
         
-        # Try to extract JSON from the response
-        json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', response_text, re.DOTALL)
-        if json_match:
-            response_text = json_match.group(1)
-        else:
-            # Try to find JSON object directly
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(0)
-        
-        # Parse JSON
-        research_data = json.loads(response_text)
+        # Parse the JSON object out of the response
+        research_data = _parse_json_response(response_text)
         return research_data
         
     except json.JSONDecodeError as e:
-        return {"error": f"Failed to parse JSON response: {str(e)}", "raw_response": response.text if 'response' in locals() else "No response"}
+        return {"error": f"Failed to parse JSON response: {str(e)}", "raw_response": response_text if 'response_text' in locals() else "No response"}
     except Exception as e:
         return {"error": f"Error generating company research: {str(e)}"}
 
 
-def _stream_gemini_analysis(cv_text: str, job_description: str):
-    """Generator function that streams Gemini analysis response."""
-    # Get API key from environment or Streamlit secrets
-    api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
-    
-    if not api_key:
-        yield "Error: Google API key not found."
-        return
-    
-    # Configure Gemini
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    # Create the prompt
-    prompt = f"""Act as an elite UK Headhunter with 15+ years of experience. Analyse the following CV against the job description provided.
+# Longest CV / job description sent to each prompt; input tokens drive cost and first-token latency
+ANALYSIS_MAX_INPUT_CHARS = 8000
+COVER_LETTER_MAX_INPUT_CHARS = 2000
+RESEARCH_MAX_JD_CHARS = 500
 
-CV Text:
-{cv_text}
 
-Job Description:
-{job_description}
+def _compact_prompt_text(text: str, limit: int = ANALYSIS_MAX_INPUT_CHARS) -> str:
+    """Collapse redundant whitespace (keeping single line breaks) and truncate text for a prompt."""
+    text = _NEWLINES_RE.sub('\n', text.strip())
+    return _HSPACE_RE.sub(' ', text)[:limit]
+
+
+# Shared by the streaming and collected analysis calls; JSON braces are doubled for str.format.
+# The fixed instructions come first and the CV / job description last, so every request shares
+# the same prompt prefix for Gemini's implicit context caching
+_ANALYSIS_PROMPT_TMPL = """Act as an elite UK Headhunter with 15+ years of experience. Analyse the CV below against the job description provided after it.
 
 Provide your analysis in the following JSON format:
 {{
@@ -374,15 +640,42 @@ Provide your analysis in the following JSON format:
     ]
 }}
 
-IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the JSON."""
+IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the JSON.
+
+CV Text:
+{cv_text}
+
+Job Description:
+{job_description}"""
+
+
+def _stream_gemini_analysis(cv_text: str, job_description: str, model=None):
+    """
+    Generator function that streams Gemini analysis response.
+    Pass model when the generator is iterated off the script thread, where st.secrets and
+    st.cache_resource are unavailable; otherwise it is resolved on the first next().
+    """
+    if model is None:
+        # Get API key from environment or Streamlit secrets
+        api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
+        
+        if not api_key:
+            yield "Error: Google API key not found."
+            return
+        
+        model = _get_gemini_model(api_key)
+    
+    # Create the prompt
+    prompt = _ANALYSIS_PROMPT_TMPL.format(
+        cv_text=_compact_prompt_text(cv_text),
+        job_description=_compact_prompt_text(job_description)
+    )
     
     # Generate response with streaming
-    response = model.generate_content(prompt, stream=True)
+    response = model.generate_content(prompt, generation_config=_JSON_GENERATION_CONFIG, stream=True)
     
-    # Yield chunks as they arrive
-    for chunk in response:
-        if chunk.text:
-            yield chunk.text
+    # Yield chunks as they arrive, stopping once the JSON object is complete
+    yield from _stream_until_json_complete(response)
 
 
 def get_gemini_analysis(cv_text: str, job_description: str) -> dict:
@@ -394,105 +687,23 @@ def get_gemini_analysis(cv_text: str, job_description: str) -> dict:
         if not api_key:
             return {"error": "Google API key not found. Please set GEMINI_API_KEY environment variable or add it to Streamlit secrets."}
         
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = _get_gemini_model(api_key)
         
         # Create the prompt
-        prompt = f"""Act as an elite UK Headhunter with 15+ years of experience. Analyse the following CV against the job description provided.
-
-CV Text:
-{cv_text}
-
-Job Description:
-{job_description}
-
-Provide your analysis in the following JSON format:
-{{
-    "match_score": <number 0-100>,
-    "salary_range": "<UK salary range, e.g., £45,000 - £55,000>",
-    "missing_hard_skills": [
-        "<skill 1>",
-        "<skill 2>",
-        "<skill 3>"
-    ],
-    "interview_questions": [
-        "<Question 1 targeting skill gaps>",
-        "<Question 2 targeting skill gaps>",
-        "<Question 3 targeting skill gaps>"
-    ],
-    "power_word_swaps": [
-        {{
-            "original": "<generic word>",
-            "replacement": "<power word>",
-            "context": "<brief explanation>"
-        }},
-        {{
-            "original": "<generic word>",
-            "replacement": "<power word>",
-            "context": "<brief explanation>"
-        }},
-        {{
-            "original": "<generic word>",
-            "replacement": "<power word>",
-            "context": "<brief explanation>"
-        }},
-        {{
-            "original": "<generic word>",
-            "replacement": "<power word>",
-            "context": "<brief explanation>"
-        }},
-        {{
-            "original": "<generic word>",
-            "replacement": "<power word>",
-            "context": "<brief explanation>"
-        }}
-    ],
-    "cv_improvements": [
-        {{
-            "current": "<current bullet point>",
-            "improved": "<improved bullet point>",
-            "reason": "<why this change helps>"
-        }},
-        {{
-            "current": "<current bullet point>",
-            "improved": "<improved bullet point>",
-            "reason": "<why this change helps>"
-        }},
-        {{
-            "current": "<current bullet point>",
-            "improved": "<improved bullet point>",
-            "reason": "<why this change helps>"
-        }}
-    ]
-}}
-
-IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the JSON."""
+        prompt = _ANALYSIS_PROMPT_TMPL.format(
+            cv_text=_compact_prompt_text(cv_text),
+            job_description=_compact_prompt_text(job_description)
+        )
         
         # Generate response with streaming
-        response = model.generate_content(prompt, stream=True)
+        response = model.generate_content(prompt, generation_config=_JSON_GENERATION_CONFIG, stream=True)
         
         # Collect full response while streaming
-        response_text = ""
-        for chunk in response:
-            if chunk.text:
-                response_text += chunk.text
+        response_text = "".join(chunk.text for chunk in response if chunk.text)
         
-        response_text = response_text.strip()
-        
-        # Try to extract JSON from the response
-        # Sometimes Gemini wraps JSON in markdown code blocks
-        json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', response_text, re.DOTALL)
-        if json_match:
-            response_text = json_match.group(1)
-        else:
-            # Try to find JSON object directly
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(0)
-        
-        # Parse JSON
-        analysis_data = json.loads(response_text)
+        # Parse the JSON object out of the response
+        # (sometimes Gemini wraps JSON in markdown code blocks)
+        analysis_data = _parse_json_response(response_text)
         return analysis_data
         
     except json.JSONDecodeError as e:
@@ -501,28 +712,31 @@ IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the J
         return {"error": f"Error generating analysis: {str(e)}"}
 
 
-def get_cover_letter(cv_text: str, job_description: str, assessment_profile: dict = None) -> str:
-    """Generate a personalized cover letter using Gemini AI."""
-    try:
+def _stream_cover_letter(cv_text: str, job_description: str, assessment_profile: dict = None, model=None):
+    """
+    Generator function that streams a personalized Gemini cover letter.
+    Pass model when the generator is iterated off the script thread, where st.secrets and
+    st.cache_resource are unavailable; otherwise it is resolved on the first next().
+    """
+    if model is None:
         # Get API key from environment or Streamlit secrets
         api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
         
         if not api_key:
-            return "Error: Google API key not found. Please set GEMINI_API_KEY environment variable or add it to Streamlit secrets."
+            yield "Error: Google API key not found."
+            return
         
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        # Build personality context if assessment is available
-        personality_context = ""
-        if assessment_profile:
-            top_traits = [trait for trait, _ in assessment_profile.get('top_traits', [])[:3]]
-            comm_style = assessment_profile.get('communication_style', '')
-            work_style = assessment_profile.get('work_style', '')
-            motivation_style = assessment_profile.get('motivation_style', '')
-            
-            personality_context = f"""
+        model = _get_gemini_model(api_key)
+    
+    # Build personality context if assessment is available
+    personality_context = ""
+    if assessment_profile:
+        top_traits = [trait for trait, _ in assessment_profile.get('top_traits', [])[:3]]
+        comm_style = assessment_profile.get('communication_style', '')
+        work_style = assessment_profile.get('work_style', '')
+        motivation_style = assessment_profile.get('motivation_style', '')
+        
+        personality_context = f"""
 IMPORTANT - Use this personality profile to tailor the language and tone:
 - Top Personality Traits: {', '.join(top_traits)}
 - Communication Style: {comm_style}
@@ -535,20 +749,20 @@ Write the cover letter using language that reflects these traits. For example:
 - If motivation style is 'results-driven', focus on achievements and outcomes
 - Match the tone to their personality traits naturally
 """
-        else:
-            personality_context = """
+    else:
+        personality_context = """
 Use professional, engaging language suitable for a UK job application. 
 Write in a confident but not overly formal tone.
 """
-        
-        # Create the prompt
-        prompt = f"""You are an expert UK career coach and cover letter writer. Draft a compelling cover letter for this job application.
+    
+    # Create the prompt
+    prompt = f"""You are an expert UK career coach and cover letter writer. Draft a compelling cover letter for this job application.
 
 CV Text:
-{cv_text[:2000]}
+{_compact_prompt_text(cv_text, COVER_LETTER_MAX_INPUT_CHARS)}
 
 Job Description:
-{job_description[:2000]}
+{_compact_prompt_text(job_description, COVER_LETTER_MAX_INPUT_CHARS)}
 
 {personality_context}
 
@@ -564,15 +778,27 @@ Requirements:
 9. The language should match the personality profile provided (if available)
 
 Format the cover letter as a proper business letter with appropriate spacing and structure."""
+    
+    # Generate response with streaming
+    response = model.generate_content(prompt, stream=True)
+    
+    # Yield chunks as they arrive
+    for chunk in response:
+        if chunk.text:
+            yield chunk.text
+
+
+def get_cover_letter(cv_text: str, job_description: str, assessment_profile: dict = None) -> str:
+    """Generate a personalized cover letter using Gemini AI."""
+    try:
+        # Get API key from environment or Streamlit secrets
+        api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
         
-        # Generate response with streaming
-        response = model.generate_content(prompt, stream=True)
+        if not api_key:
+            return "Error: Google API key not found. Please set GEMINI_API_KEY environment variable or add it to Streamlit secrets."
         
         # Collect full response while streaming
-        response_text = ""
-        for chunk in response:
-            if chunk.text:
-                response_text += chunk.text
+        response_text = "".join(_stream_cover_letter(cv_text, job_description, assessment_profile))
         
         return response_text
         
@@ -580,17 +806,27 @@ Format the cover letter as a proper business letter with appropriate spacing and
         return f"Error generating cover letter: {str(e)}"
 
 
+@st.cache_resource(ttl=3600, max_entries=1, show_spinner=False)
+def _create_supabase_client() -> Client:
+    """
+    Create the Supabase client, shared across reruns and sessions so its HTTP connection pool is reused.
+    Rebuilt hourly. Raises when configuration is missing or creation fails, so no failure is cached.
+    SUPABASE_KEY should be the service role key: get_user and user_directory return password hashes and
+    are closed to the anon role (see supabase_setup.sql). It stays on the server; Streamlit never sends it to browsers.
+    """
+    supabase_url = os.getenv('SUPABASE_URL') or st.secrets.get('SUPABASE_URL', None)
+    supabase_key = os.getenv('SUPABASE_KEY') or st.secrets.get('SUPABASE_KEY', None)
+    
+    if not supabase_url or not supabase_key:
+        raise LookupError("SUPABASE_URL / SUPABASE_KEY not configured")
+    
+    return create_client(supabase_url, supabase_key)
+
+
 def get_supabase_client() -> Client:
-    """Initialize and return Supabase client."""
+    """Return the shared Supabase client, or None if it cannot be created; the next call tries again."""
     try:
-        supabase_url = os.getenv('SUPABASE_URL') or st.secrets.get('SUPABASE_URL', None)
-        supabase_key = os.getenv('SUPABASE_KEY') or st.secrets.get('SUPABASE_KEY', None)
-        
-        if not supabase_url or not supabase_key:
-            return None
-        
-        supabase: Client = create_client(supabase_url, supabase_key)
-        return supabase
+        return _create_supabase_client()
     except Exception as e:
         return None
 
@@ -611,7 +847,7 @@ def save_analysis_to_supabase(supabase: Client, username: str, job_title: str, j
             research_dict = company_research
             if isinstance(company_research, str):
                 try:
-                    research_dict = json.loads(company_research)
+                    research_dict = _json_loads(company_research)
                 except:
                     research_dict = None
             
@@ -624,18 +860,22 @@ def save_analysis_to_supabase(supabase: Client, username: str, job_title: str, j
             'job_title': job_title,
             'company_name': company_name,
             'match_score': gemini_analysis.get('match_score', 0) if gemini_analysis else 0,
-            'analysis_text': json.dumps(gemini_analysis) if gemini_analysis else '{}',
-            'company_research': json.dumps(company_research) if company_research else None,
+            'analysis_text': _json_dumps(gemini_analysis) if gemini_analysis else '{}',
+            'company_research': _json_dumps(company_research) if company_research else None,
             'cover_letter': cover_letter[:10000] if cover_letter else None,
-            'created_at': datetime.now().isoformat()
+            'created_at': datetime.now(_UTC).isoformat()
         }
         
         if email:
             data['user_email'] = email
         
+        # The insert returns the new row, so the sidebar can list it without re-fetching the history
         result = supabase.table('career_history').insert(data).execute()
         
         if result.data:
+            if email:
+                clear_user_history_cache(email)
+            apply_history_insert(result.data[0])
             return True, None
         else:
             return False, "No data returned from Supabase insert"
@@ -657,18 +897,24 @@ def save_analysis_to_supabase(supabase: Client, username: str, job_title: str, j
 
 
 def load_analysis_from_supabase(supabase: Client, username: str, history_id: int, email: str = None) -> dict:
-    """Load a specific analysis from Supabase."""
+    """Load a specific analysis, using the full rows already held in session state before querying Supabase."""
     try:
+        cached = st.session_state.get('history_cache', {}).get(history_id)
+        if cached and (not email or cached.get('user_email') == email):
+            return cached
+        
         if not supabase:
             return None
         
         # Load by ID and user_email if provided
         if email:
-            result = supabase.table('career_history').select('*').eq('id', history_id).eq('user_email', email).execute()
+            result = supabase.table('career_history').select('*').eq('id', history_id).eq('user_email', email).limit(1).execute()
         else:
-            result = supabase.table('career_history').select('*').eq('id', history_id).execute()
+            result = supabase.table('career_history').select('*').eq('id', history_id).limit(1).execute()
         
         if result.data and len(result.data) > 0:
+            # Keep the full row so reopening this item needs no further query
+            st.session_state.setdefault('history_cache', {})[history_id] = result.data[0]
             return result.data[0]
         return None
     except Exception as e:
@@ -676,147 +922,52 @@ def load_analysis_from_supabase(supabase: Client, username: str, history_id: int
         return None
 
 
-def get_user_history(supabase: Client, username: str) -> list:
-    """Get all analysis history for a user by username."""
-    try:
-        if not supabase:
-            return []
-        
-        result = supabase.table('career_history').select('id, job_title, company_name, match_score, created_at').eq('username', username).order('created_at', desc=True).execute()
-        
-        return result.data if result.data else []
-    except Exception as e:
-        return []
+# History rows fetched per page for the sidebar; more are loaded on request
+HISTORY_PAGE_SIZE = 50
 
 
-def load_users_from_database(supabase: Client) -> dict:
-    """Load users from Supabase database. Tries 'user_profiles' table first, then 'user_accounts', then 'users' table."""
-    users = {}
-    try:
-        if not supabase:
-            return {}
-        
-        # Try to fetch users from 'user_profiles' table first (as suggested by Supabase)
-        # The table has columns: username, email, name, password_hash, created_at
-        try:
-            result = supabase.table('user_profiles').select('username, name, password_hash, email').execute()
-            if result.data:
-                for user in result.data:
-                    username = user.get('username', '').lower()
-                    users[username] = {
-                        'name': user.get('name', username),
-                        'password': user.get('password_hash', ''),  # Use password_hash for streamlit-authenticator
-                        'email': user.get('email', f'{username}@example.com')
-                    }
-        except Exception as e1:
-            # Fallback to 'user_accounts' table (newer schema)
-            try:
-                result = supabase.table('user_accounts').select('username, full_name, password_hash, email').execute()
-                if result.data:
-                    for user in result.data:
-                        username = user.get('username', '').lower()
-                        users[username] = {
-                            'name': user.get('full_name', username),
-                            'password': user.get('password_hash', ''),
-                            'email': user.get('email', f'{username}@example.com')
-                        }
-            except Exception as e2:
-                # Final fallback to 'users' table (older schema)
-                try:
-                    result = supabase.table('users').select('username, name, password, email').execute()
-                    if result.data:
-                        for user in result.data:
-                            username = user.get('username', '').lower()
-                            users[username] = {
-                                'name': user.get('name', username),
-                                'password': user.get('password', ''),
-                                'email': user.get('email', f'{username}@example.com')
-                            }
-                except:
-                    pass
-        
-    except Exception as e:
-        pass
-    
-    return users
+# Columns the history list needs; display_name is added when the column exists
+_HISTORY_LIST_COLUMNS = 'id, job_title, company_name, match_score, created_at'
 
 
-def save_user_to_database(supabase: Client, username: str, name: str, password_hash: str, email: str) -> bool:
-    """Save a new user to Supabase database. Tries 'user_profiles' table first, then 'user_accounts', then 'users' table."""
+def _select_user_history(supabase: Client, email: str, columns: str, start: int = None, end: int = None) -> list:
+    """
+    Select career_history rows for email, newest first, optionally for a row range.
+    For list columns, display_name is tried first, falling back to without it if the column doesn't exist.
+    """
+    def run(select_columns: str) -> list:
+        query = supabase.table('career_history').select(select_columns).eq('user_email', email).order('created_at', desc=True)
+        if start is not None:
+            query = query.range(start, end)
+        result = query.execute()
+        return result.data if result.data else []
+    
+    if columns == '*':
+        return run(columns)
     try:
-        if not supabase:
-            return False
-        
-        username_lower = username.lower()
-        
-        # Try 'user_profiles' table first (as suggested by Supabase)
-        try:
-            # Check if user already exists
-            existing = supabase.table('user_profiles').select('username').eq('username', username_lower).execute()
-            if existing.data:
-                return False  # User already exists
-            
-            # Insert new user
-            # The table has columns: username, email, name, password_hash, created_at
-            user_data = {
-                'username': username_lower,
-                'name': name,
-                'password_hash': password_hash,
-                'email': email,
-                'created_at': datetime.now().isoformat()
-            }
-            
-            result = supabase.table('user_profiles').insert(user_data).execute()
-            return True
-        except Exception as e1:
-            # Try 'user_accounts' table (newer schema)
-            try:
-                # Check if user already exists
-                existing = supabase.table('user_accounts').select('username').eq('username', username_lower).execute()
-                if existing.data:
-                    return False  # User already exists
-                
-                # Insert new user
-                user_data = {
-                    'username': username_lower,
-                    'full_name': name,
-                    'password_hash': password_hash,
-                    'email': email,
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                result = supabase.table('user_accounts').insert(user_data).execute()
-                return True
-            except Exception as e2:
-                # Try 'users' table (older schema)
-                try:
-                    # Check if user already exists
-                    existing = supabase.table('users').select('username').eq('username', username_lower).execute()
-                    if existing.data:
-                        return False  # User already exists
-                    
-                    # Insert new user
-                    user_data = {
-                        'username': username_lower,
-                        'name': name,
-                        'password': password_hash,
-                        'email': email,
-                        'created_at': datetime.now().isoformat()
-                    }
-                    
-                    result = supabase.table('users').insert(user_data).execute()
-                    return True
-                except Exception as e3:
-                    return False
-    except Exception as e:
-        return False
+        return run(f'{columns}, display_name')
+    except Exception:
+        return run(columns)
+
+
+@st.cache_resource
+def _history_cache_versions() -> defaultdict:
+    """Per-email history cache versions, shared by all sessions. Bumping one orphans that user's cached entries."""
+    return defaultdict(int)
+
+
+def history_cache_version(email: str) -> int:
+    """Current cache version for email's history; pass it to fetch_user_history."""
+    return _history_cache_versions()[email]
 
 
 @st.cache_data(ttl=600)  # Caches for 10 minutes
-def fetch_user_history(email: str) -> list:
+def fetch_user_history(email: str, page: int = 0, cache_version: int = 0) -> list:
     """
-    Cached function to fetch user history from Supabase.
+    Cached function to fetch one page of user history from Supabase.
     Caches for 10 minutes to reduce database queries.
+    Only the columns the sidebar renders are selected; full rows are loaded when an item is opened.
+    cache_version (from history_cache_version) is only part of the cache key.
     """
     try:
         if not email:
@@ -826,42 +977,250 @@ def fetch_user_history(email: str) -> list:
         if not supabase:
             return []
         
+        start = page * HISTORY_PAGE_SIZE
+        end = start + HISTORY_PAGE_SIZE - 1
+        
         # Query career_history table filtering by user_email for privacy
-        # Try with display_name first, fallback to without if column doesn't exist
         try:
-            result = supabase.table('career_history').select(
-                'id, job_title, company_name, match_score, created_at, user_email, display_name'
-            ).eq('user_email', email).order('created_at', desc=True).execute()
-        except Exception as e:
-            # If display_name column doesn't exist, try without it
-            try:
-                result = supabase.table('career_history').select(
-                    'id, job_title, company_name, match_score, created_at, user_email'
-                ).eq('user_email', email).order('created_at', desc=True).execute()
-            except Exception as e2:
-                # Log error but return empty list
-                st.error(f"Error fetching history: {str(e2)}")
-                return []
-        
-        return result.data if result.data else []
+            return _select_user_history(supabase, email, _HISTORY_LIST_COLUMNS, start, end)
+        except Exception as e2:
+            # Log error but return empty list
+            st.error(f"Error fetching history: {str(e2)}")
+            return []
     except Exception as e:
         st.error(f"Error in fetch_user_history: {str(e)}")
         return []
 
 
-def get_user_history_by_email(supabase: Client, email: str) -> list:
+def get_user_history_by_email(supabase: Client, email: str, pages: int = 1) -> list:
     """
-    Get all analysis history for a user by email.
+    Get the first pages of analysis history for a user by email.
     Only returns records where user_email matches the provided email (multi-user privacy).
     Ordered by date (newest first).
     This function now uses the cached fetch_user_history function.
     """
-    return fetch_user_history(email)
+    history = []
+    version = history_cache_version(email)
+    for page in range(pages):
+        rows = fetch_user_history(email, page, version)
+        history.extend(rows)
+        if len(rows) < HISTORY_PAGE_SIZE:
+            break
+    return history
+
+
+def clear_user_history_cache(email: str):
+    """Invalidate cached history pages and prefetched rows after a history change."""
+    # A new version moves every page of this user's history (in any session) to fresh cache keys;
+    # other users' entries stay valid, and the orphaned ones expire with the TTL
+    _history_cache_versions()[email] += 1
+    st.session_state.pop('history_cache', None)
+    st.session_state.pop('history_edits', None)
+    st.session_state.pop('history_inserts', None)
+
+
+def apply_history_insert(row: dict):
+    """
+    Record a newly saved history row in session state so the history lists it without a re-fetch.
+    Inserts are prepended to the cached rows until the history cache is next cleared; call
+    clear_user_history_cache first so other sessions pick the row up on their next rerun.
+    """
+    st.session_state.setdefault('history_inserts', []).insert(0, row)
+    st.session_state.setdefault('history_cache', {})[row.get('id')] = row
+
+
+def apply_history_rename(history_id, display_name):
+    """
+    Record a display_name change in session state so the cached history reflects it without a re-fetch.
+    Edits are overlaid on the cached rows until the history cache is next cleared; call
+    clear_user_history_cache first so other sessions pick the change up on their next rerun.
+    """
+    st.session_state.setdefault('history_edits', {})[history_id] = display_name
+    cached_row = st.session_state.get('history_cache', {}).get(history_id)
+    if cached_row is not None:
+        cached_row['display_name'] = display_name
+
+
+# (table, name column, password column) for each user table schema, in lookup order
+_USER_TABLE_SCHEMAS = (
+    ('user_profiles', 'name', 'password_hash'),  # as suggested by Supabase
+    ('user_profiles', 'full_name', 'password_hash'),
+    ('user_accounts', 'full_name', 'password_hash'),  # newer schema
+    ('users', 'name', 'password'),  # older schema
+)
+
+
+def _user_table_columns(client: Client) -> dict:
+    """
+    Column names of every candidate user table in one get_columns RPC (see supabase_setup.sql).
+    Returns {table: {column, ...}}, or None if the RPC is not installed.
+    """
+    tables = sorted({table for table, _, _ in _USER_TABLE_SCHEMAS})
+    try:
+        result = client.rpc('get_columns', {'tbls': tables}).execute()
+    except Exception:
+        return None
+    columns = defaultdict(set)
+    for row in result.data or []:
+        columns[row['table_name']].add(row['column_name'])
+    return columns
+
+
+@st.cache_resource(show_spinner=False)
+def get_user_table_schema(_client: Client) -> dict:
+    """
+    Detect the user table schema once and memoize it.
+    Returns {'table': ..., 'name_col': ..., 'pwd_col': ...}. Raises LookupError if none is reachable,
+    so a transient failure is retried on the next call instead of being cached.
+    """
+    # One metadata query instead of a failing request per missing table or column
+    columns = _user_table_columns(_client)
+    if columns is not None:
+        for table, name_col, pwd_col in _USER_TABLE_SCHEMAS:
+            if {'username', name_col, pwd_col, 'email'} <= columns.get(table, set()):
+                return {'table': table, 'name_col': name_col, 'pwd_col': pwd_col}
+    
+    # get_columns not installed (or saw no table): probe each schema in turn
+    for table, name_col, pwd_col in _USER_TABLE_SCHEMAS:
+        try:
+            _client.table(table).select(f'username, {name_col}, {pwd_col}, email').limit(1).execute()
+        except Exception:
+            continue
+        return {'table': table, 'name_col': name_col, 'pwd_col': pwd_col}
+    raise LookupError("No user table found in Supabase")
+
+
+def _user_select(schema: dict) -> str:
+    """Select list for a user table, aliased to the user_directory column names."""
+    return f"username, name:{schema['name_col']}, password_hash:{schema['pwd_col']}, email"
+
+
+# Characters a username may contain. Registration enforces it, and only names that match are sent
+# through the ilike filter, where PostgREST turns any '*' into '%' and it cannot be escaped.
+USERNAME_RE = re.compile(r'[A-Za-z0-9._@-]{1,64}')
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE/ILIKE wildcards so value only matches literally. Callers check USERNAME_RE first, which excludes '*'."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# get_user RPC errors that mean "use the user table instead": the function is not installed (PostgREST),
+# or the key is not allowed to execute it (EXECUTE is granted to service_role only)
+_RPC_UNAVAILABLE = ('PGRST202', '42501')
+
+
+@st.cache_data(ttl=60, show_spinner=False)  # Caches for 1 minute; cleared on registration
+def _fetch_user_row(_supabase: Client, username_lower: str) -> dict:
+    """
+    Fetch the user row (username, name, password_hash, email, source_table) for a login, or None if there is no such user.
+    Uses the get_user RPC, falling back to the detected user table. Password checks stay outside the cache.
+    """
+    # One round trip over every user table via the get_user RPC (see supabase_setup.sql)
+    try:
+        result = _supabase.rpc('get_user', {'p_username': username_lower}).execute()
+    except APIError as e:
+        if e.code not in _RPC_UNAVAILABLE:
+            raise
+        # RPC unavailable: query the detected user table directly
+        schema = get_user_table_schema(_supabase)
+        query = _supabase.table(schema['table']).select(_user_select(schema))
+        if USERNAME_RE.fullmatch(username_lower):
+            # Case-insensitive match on the server; wildcards are escaped so ilike acts as equality
+            query = query.ilike('username', _escape_like(username_lower))
+        else:
+            # Older names outside the allow-list (which could carry '*') only match exactly
+            query = query.eq('username', username_lower)
+        result = query.limit(1).execute()
+        for row in result.data or []:
+            row['source_table'] = schema['table']
+    
+    if not result.data:
+        return None
+    
+    user_row = result.data[0]
+    # Keep the hash in bcrypt's native bytes form so each login attempt skips re-encoding it
+    user_row['password_hash_bytes'] = (user_row.get('password_hash') or '').encode('utf-8')
+    return user_row
+
+
+_BCRYPT_PREFIXES = (b'$2a$', b'$2b$', b'$2y$')
+_ARGON2_PREFIX = b'$argon2'
+
+
+@st.cache_resource
+def get_password_hasher():
+    """Shared argon2id hasher (OWASP parameters), or None if argon2-cffi is not installed."""
+    if PasswordHasher is None:
+        return None
+    return PasswordHasher(time_cost=3, memory_cost=65536, parallelism=2, hash_len=32, salt_len=16)
+
+
+def hash_password(password: str) -> str:
+    """Hash a new password with argon2id, falling back to bcrypt when argon2-cffi isn't installed."""
+    hasher = get_password_hasher()
+    if hasher is None:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return hasher.hash(password)
+
+
+def _needs_rehash(stored_hash: bytes) -> bool:
+    """Whether a verified hash should be replaced by a fresh argon2id hash (legacy bcrypt or outdated parameters)."""
+    hasher = get_password_hasher()
+    if hasher is None:
+        return False
+    if not stored_hash.startswith(_ARGON2_PREFIX):
+        return True
+    return hasher.check_needs_rehash(stored_hash.decode('utf-8'))
+
+
+def _rehash_password(supabase: Client, db_username: str, password: str, source_table: str = None) -> None:
+    """
+    Migrate a user's stored hash to argon2id after a successful login. Failures keep the old hash.
+    source_table is the table the user row came from; without it the detected user table is updated.
+    """
+    try:
+        pwd_cols = {table: pwd_col for table, _, pwd_col in _USER_TABLE_SCHEMAS}
+        if source_table in pwd_cols:
+            table, pwd_col = source_table, pwd_cols[source_table]
+        else:
+            schema = get_user_table_schema(supabase)
+            table, pwd_col = schema['table'], schema['pwd_col']
+        supabase.table(table).update(
+            {pwd_col: hash_password(password)},
+            returning=ReturnMethod.minimal
+        ).eq('username', db_username).execute()
+        _fetch_user_row.clear(supabase, db_username.lower())
+    except Exception:
+        pass
+
+
+@st.cache_resource
+def _verification_secret() -> bytes:
+    """Per-process key so cached password checks are never keyed on the plaintext password."""
+    return os.urandom(32)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _check_password_cached(password_digest: str, stored_hash: bytes, _password: str) -> bool:
+    """argon2/bcrypt check, cached by (HMAC of password, stored hash). _password is excluded from the cache key."""
+    if stored_hash.startswith(_ARGON2_PREFIX):
+        try:
+            return get_password_hasher().verify(stored_hash, _password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return bcrypt.checkpw(_password.encode('utf-8'), stored_hash)
+
+
+def _check_password(password: str, stored_hash: bytes) -> bool:
+    """Verify password against an argon2 or bcrypt hash, skipping the work factor for recently verified pairs."""
+    digest = hmac.new(_verification_secret(), password.encode('utf-8'), hashlib.sha256).hexdigest()
+    return _check_password_cached(digest, stored_hash, password)
 
 
 def authenticate_user_from_database(supabase: Client, username: str, password: str) -> tuple:
     """
-    Authenticate user by querying user_accounts table in Supabase.
+    Authenticate user against the cached user row, verifying the password locally.
     Returns (is_authenticated: bool, user_data: dict or None)
     """
     try:
@@ -869,54 +1228,25 @@ def authenticate_user_from_database(supabase: Client, username: str, password: s
             return False, None
         
         username_lower = username.lower()
+        user_data = _fetch_user_row(supabase, username_lower)
         
-        # Query user_profiles table first (as suggested by Supabase), then fallback to user_accounts
-        # Try with 'name' column first (common alternative to 'full_name')
-        result = None
-        try:
-            # Try user_profiles with 'name' column (instead of 'full_name')
-            # First, let's try without case sensitivity - query all users and filter
-            all_users = supabase.table('user_profiles').select('username, name, password_hash, email').execute()
-            # Filter for matching username (case-insensitive)
-            result_data = None
-            if all_users.data:
-                for user in all_users.data:
-                    db_username = user.get('username', '')
-                    db_username_lower = db_username.lower()
-                    if db_username_lower == username_lower:
-                        result_data = [user]
-                        break
-            result = type('Result', (), {'data': result_data})()
-        except Exception as e1:
-            # Try with 'full_name' column
-            try:
-                result = supabase.table('user_profiles').select('username, full_name, password_hash, email').eq('username', username_lower).execute()
-            except Exception as e2:
-                # Fallback to user_accounts table
-                try:
-                    result = supabase.table('user_accounts').select('username, full_name, password_hash, email').eq('username', username_lower).execute()
-                except Exception as e3:
-                    raise e3
-        
-        if result is None:
-            return False, None
-        
-        if result.data and len(result.data) > 0:
-            user_data = result.data[0]
-            stored_hash = user_data.get('password_hash', '')
+        if user_data:
+            stored_hash = user_data.get('password_hash_bytes', b'')
             db_username = user_data.get('username', '')
-            # Get name from either 'name' or 'full_name' column
-            user_name = user_data.get('name') or user_data.get('full_name') or db_username
+            user_name = user_data.get('name') or db_username
             
-            if not stored_hash:
+            # Malformed or unrecognised hashes can never match, so skip the expensive check
+            is_argon2 = stored_hash.startswith(_ARGON2_PREFIX) and get_password_hasher() is not None
+            if not (is_argon2 or stored_hash.startswith(_BCRYPT_PREFIXES)):
                 return False, None
             
-            # Verify password using bcrypt (works with both bcrypt and stauth.Hasher hashes)
-            import bcrypt
+            # Verify password with argon2, or bcrypt for legacy (stauth.Hasher) hashes
             try:
-                # Try bcrypt check first (works for both bcrypt and stauth.Hasher hashes)
-                password_check = bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+                # Repeat checks of the same credentials (e.g. across reruns) come from the cache
+                password_check = _check_password(password, stored_hash)
                 if password_check:
+                    if db_username and _needs_rehash(stored_hash):
+                        _rehash_password(supabase, db_username, password, user_data.get('source_table'))
                     return True, {
                         'username': user_data.get('username', username_lower),
                         'name': user_name,
@@ -924,7 +1254,7 @@ def authenticate_user_from_database(supabase: Client, username: str, password: s
                     }
                 else:
                     return False, None
-            except Exception as bcrypt_error:
+            except Exception as verify_error:
                 return False, None
         else:
             return False, None
@@ -939,7 +1269,7 @@ def save_psychometric_assessment(supabase: Client, email: str, personality_profi
             return False
         
         # Convert personality_profile to JSON string
-        profile_json = json.dumps(personality_profile)
+        profile_json = _json_dumps(personality_profile)
         
         # Update user_profiles table with personality_profile
         # Use upsert pattern - update if exists, insert key fields if not
@@ -947,7 +1277,7 @@ def save_psychometric_assessment(supabase: Client, email: str, personality_profi
             # First, try to update existing user
             result = supabase.table('user_profiles').update({
                 'personality_profile': profile_json,
-                'personality_profile_updated_at': datetime.now().isoformat()
+                'personality_profile_updated_at': datetime.now(_UTC).isoformat()
             }).eq('email', email).execute()
             
             # If update succeeded (affected at least one row), return True
@@ -978,13 +1308,13 @@ def load_psychometric_assessment(supabase: Client, email: str) -> dict:
         
         # Try to get personality_profile from user_profiles table
         try:
-            result = supabase.table('user_profiles').select('personality_profile').eq('email', email).execute()
+            result = supabase.table('user_profiles').select('personality_profile').eq('email', email).limit(1).execute()
             
             if result.data and len(result.data) > 0:
                 profile_json = result.data[0].get('personality_profile')
                 if profile_json:
                     # Parse JSON string back to dict
-                    return json.loads(profile_json)
+                    return _json_loads(profile_json)
         except Exception as e:
             # Column might not exist or other error - return empty dict
             return {}
@@ -994,173 +1324,153 @@ def load_psychometric_assessment(supabase: Client, email: str) -> dict:
     return {}
 
 
-def get_user_email_from_database(supabase: Client, username: str) -> str:
-    """Get user email from database. Tries 'user_profiles' table first, then 'user_accounts', then 'users' table."""
+def _fetch_user_email_uncached(username: str) -> str:
+    """
+    Get user email from database via the get_user RPC, falling back to the detected user table.
+    Raises if the lookup fails, so errors are not cached.
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        # Fallback to hardcoded admin email
+        if username.lower() == 'admin':
+            return 'admin@example.com'
+        return f"{username}@example.com"
+    
+    username_lower = username.lower()
+    
+    # One round trip over every user table via the get_user RPC (see supabase_setup.sql)
     try:
-        if not supabase:
-            # Fallback to hardcoded admin email
-            if username.lower() == 'admin':
-                return 'admin@example.com'
-            return f"{username}@example.com"
-        
-        username_lower = username.lower()
-        
-        # Try 'user_profiles' table first (as suggested by Supabase)
-        try:
-            result = supabase.table('user_profiles').select('email').eq('username', username_lower).execute()
-            if result.data and len(result.data) > 0:
-                return result.data[0].get('email', f"{username}@example.com")
-        except:
-            # Try 'user_accounts' table (newer schema)
-            try:
-                result = supabase.table('user_accounts').select('email').eq('username', username_lower).execute()
-                if result.data and len(result.data) > 0:
-                    return result.data[0].get('email', f"{username}@example.com")
-            except:
-                # Try 'users' table (older schema)
-                try:
-                    result = supabase.table('users').select('email').eq('username', username_lower).execute()
-                    if result.data and len(result.data) > 0:
-                        return result.data[0].get('email', f"{username}@example.com")
-                except:
-                    pass
-    except:
-        pass
+        result = supabase.rpc('get_user', {'p_username': username_lower}).execute()
+        if result.data and len(result.data) > 0:
+            return result.data[0].get('email') or f"{username}@example.com"
+        return f"{username}@example.com"
+    except APIError as e:
+        if e.code not in _RPC_UNAVAILABLE:
+            raise
+        # RPC unavailable: query the detected user table directly
+        schema = get_user_table_schema(supabase)
+        result = supabase.table(schema['table']).select('email').eq('username', username_lower).limit(1).execute()
+        if result.data and len(result.data) > 0:
+            return result.data[0].get('email', f"{username}@example.com")
     
     # Fallback to username@example.com if email not found
     return f"{username}@example.com"
 
 
-def load_users_from_database(supabase: Client) -> dict:
-    """Load users from Supabase database. Tries 'user_profiles' table first, then 'user_accounts', then 'users' table."""
+@st.cache_data(ttl=300, show_spinner=False)  # Caches for 5 minutes; cleared on registration
+def _cached_user_email(username: str) -> str:
+    return _fetch_user_email_uncached(username)
+
+
+def get_user_email_from_database(username: str) -> str:
+    """Get a user's email, cached per username. Lookup errors fall back to username@example.com uncached."""
+    try:
+        return _cached_user_email(username)
+    except Exception:
+        return f"{username}@example.com"
+
+
+@st.cache_data(ttl=600)  # Caches for 10 minutes; cleared on registration
+def load_users_from_database(_supabase: Client) -> dict:
+    """
+    Load users from Supabase database in one query via the 'user_directory' view (see supabase_setup.sql).
+    Falls back to the detected user table if the view has not been created, or if the configured key is
+    not the service role (the view is closed to the anon and authenticated roles).
+    """
     users = {}
     try:
-        if not supabase:
+        if not _supabase:
             return {}
         
-        # Try to fetch users from 'user_profiles' table first (as suggested by Supabase)
-        # The table has columns: username, email, name, password_hash, created_at
         try:
-            result = supabase.table('user_profiles').select('username, name, password_hash, email').execute()
-            if result.data:
-                for user in result.data:
-                    username = user.get('username', '').lower()
-                    users[username] = {
-                        'name': user.get('name', username),
-                        'password': user.get('password_hash', ''),  # Use password_hash for streamlit-authenticator
-                        'email': user.get('email', f'{username}@example.com')
-                    }
-        except Exception as e1:
-            # Fallback to 'user_accounts' table (newer schema)
-            try:
-                result = supabase.table('user_accounts').select('username, full_name, password_hash, email').execute()
-                if result.data:
-                    for user in result.data:
-                        username = user.get('username', '').lower()
-                        users[username] = {
-                            'name': user.get('full_name', username),
-                            'password': user.get('password_hash', ''),
-                            'email': user.get('email', f'{username}@example.com')
-                        }
-            except Exception as e2:
-                # Final fallback to 'users' table (older schema)
-                try:
-                    result = supabase.table('users').select('username, name, password, email').execute()
-                    if result.data:
-                        for user in result.data:
-                            username = user.get('username', '').lower()
-                            users[username] = {
-                                'name': user.get('name', username),
-                                'password': user.get('password', ''),
-                                'email': user.get('email', f'{username}@example.com')
-                            }
-                except:
-                    pass
-        
+            result = _supabase.table('user_directory').select('username, name, password_hash, email').execute()
+            rows = result.data or []
+        except Exception:
+            # View not created: read the detected user table with the same column names
+            schema = get_user_table_schema(_supabase)
+            result = _supabase.table(schema['table']).select(_user_select(schema)).execute()
+            rows = result.data or []
+        
+        for user in rows:
+            username = (user.get('username') or '').lower()
+            if username in users:
+                continue  # Earlier tables take precedence, as with the old fallback order
+            users[username] = {
+                'name': user.get('name') or username,
+                'password': user.get('password_hash') or '',  # Use password_hash for streamlit-authenticator
+                'email': user.get('email') or f'{username}@example.com'
+            }
     except Exception as e:
         pass
     
     return users
 
 
+# Postgres error codes PostgREST passes through for registration inserts
+_NO_CONFLICT_TARGET = '42P10'
+_UNIQUE_VIOLATION = '23505'
+
+
 def save_user_to_database(supabase: Client, username: str, name: str, password_hash: str, email: str) -> bool:
-    """Save a new user to Supabase database. Tries 'user_profiles' table first, then 'user_accounts', then 'users' table."""
+    """Save a new user to Supabase database, in the user table detected by get_user_table_schema."""
     try:
         if not supabase:
             return False
         
         username_lower = username.lower()
         
-        # Try 'user_profiles' table first (as suggested by Supabase)
+        schema = get_user_table_schema(supabase)
+        
+        # Insert new user using the detected table's column names
+        user_data = {
+            'username': username_lower,
+            schema['name_col']: name,
+            schema['pwd_col']: password_hash,
+            'email': email,
+            'created_at': datetime.now(_UTC).isoformat()
+        }
+        
         try:
-            # Check if user already exists
-            existing = supabase.table('user_profiles').select('username').eq('username', username_lower).execute()
-            if existing.data:
-                return False  # User already exists
-            
-            # Insert new user
-            # The table has columns: username, email, name, password_hash, created_at
-            user_data = {
-                'username': username_lower,
-                'name': name,
-                'password_hash': password_hash,
-                'email': email,
-                'created_at': datetime.now().isoformat()
-            }
-            
-            result = supabase.table('user_profiles').insert(user_data).execute()
-            return True
-        except Exception as e1:
-            # Try 'user_accounts' table (newer schema)
-            try:
-                # Check if user already exists
-                existing = supabase.table('user_accounts').select('username').eq('username', username_lower).execute()
-                if existing.data:
-                    return False  # User already exists
-                
-                # Insert new user
-                user_data = {
-                    'username': username_lower,
-                    'full_name': name,
-                    'password_hash': password_hash,
-                    'email': email,
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                result = supabase.table('user_accounts').insert(user_data).execute()
-                return True
-            except Exception as e2:
-                # Try 'users' table (older schema)
-                try:
-                    # Check if user already exists
-                    existing = supabase.table('users').select('username').eq('username', username_lower).execute()
-                    if existing.data:
-                        return False  # User already exists
-                    
-                    # Insert new user
-                    user_data = {
-                        'username': username_lower,
-                        'name': name,
-                        'password': password_hash,
-                        'email': email,
-                        'created_at': datetime.now().isoformat()
-                    }
-                    
-                    result = supabase.table('users').insert(user_data).execute()
-                    return True
-                except Exception as e3:
-                    return False
+            # ON CONFLICT (username) DO NOTHING: one round trip, and no race between check and insert.
+            # An existing username returns no rows.
+            result = supabase.table(schema['table']).upsert(user_data, on_conflict='username', ignore_duplicates=True).execute()
+            return bool(result.data)  # False if user already exists
+        except APIError as e:
+            # 42P10: the table has no unique constraint on username (supabase_setup.sql not applied)
+            if e.code != _NO_CONFLICT_TARGET:
+                raise
+        
+        # Check-then-insert, as before the constraint existed
+        existing = supabase.table(schema['table']).select('username').eq('username', username_lower).limit(1).execute()
+        if existing.data:
+            return False  # User already exists
+        try:
+            supabase.table(schema['table']).insert(user_data, returning=ReturnMethod.minimal).execute()
+        except APIError as e:
+            if e.code == _UNIQUE_VIOLATION:
+                return False  # Taken between the check and the insert
+            raise
+        return True
     except Exception as e:
         return False
 
 
 def setup_authentication():
-    """Set up authentication configuration, loading users from database."""
+    """
+    Set up authentication configuration, loading users from database.
+    The authenticator is kept in session state and only rebuilt when the user list changes.
+    """
     # Get Supabase client
     supabase = get_supabase_client()
     
     users_dict = load_users_from_database(supabase)
     
+    # Fingerprint before Authenticate gets the dict, since it mutates credentials in place
+    fingerprint = hashlib.sha256(_json_dumps(users_dict).encode('utf-8')).hexdigest()
+    cached = st.session_state.get('_authenticator')
+    if cached and cached[0] == fingerprint and not st.session_state.pop('reload_auth', False):
+        return cached[1]
+    
     # Configuration dictionary for authentication
     config = {
         'credentials': {
@@ -1183,7 +1493,58 @@ def setup_authentication():
         config['cookie']['expiry_days']
     )
     
-    return authenticator
+    st.session_state['_authenticator'] = (fingerprint, authenticator)
+    return authenticator
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _format_history_options(history_rows: tuple) -> tuple:
+    """
+    Build the history selectbox labels from (id, job_title, company_name, display_name, match_score, created_at) rows.
+    Returns (history_options, label_to_id) where label_to_id maps each label to its history ID.
+    """
+    history_options = ["Select a past application..."]
+    label_to_id = {}
+    
+    for history_id, job_title, company, display_name, match_score, created_at in history_rows:
+        # Format date
+        try:
+            if created_at:
+                date_obj = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                date_str = date_obj.strftime('%d %b %Y')
+            else:
+                date_str = 'Unknown date'
+        except:
+            date_str = 'Unknown date'
+        
+        # Create display label - use custom name if set, otherwise company name first, then job title
+        if display_name:
+            label = f"{display_name} ({match_score}/100) - {date_str}"
+        elif company:
+            label = f"{company} - {job_title} ({match_score}/100) - {date_str}"
+        else:
+            label = f"{job_title} ({match_score}/100) - {date_str}"
+        
+        history_options.append(label)
+        label_to_id[label] = history_id
+    
+    return history_options, label_to_id
+
+
+def _parse_history_json(text: str) -> dict:
+    """Parse a stored JSON payload, treating empty or invalid text as an empty dict."""
+    if not text or not text.strip():
+        return {}
+    try:
+        return _json_loads(text)
+    except json.JSONDecodeError:
+        return {}
+
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def _parse_history_payloads(history_id: int, analysis_text: str, company_research: str) -> tuple:
+    """Parse a history row's analysis and company research JSON once; flipping back to an entry reuses the result."""
+    return _parse_history_json(analysis_text), _parse_history_json(company_research)
 
 
 @st.fragment
@@ -1199,52 +1560,53 @@ def render_history_sidebar(supabase, username, user_email):
         # Get user's history by email - ensures multi-user privacy
         # Only returns records where email matches the logged-in user
         # Ordered by date (newest first)
-        history = get_user_history_by_email(supabase, user_email)
+        history_pages = st.session_state.get('history_pages', 1)
+        history = get_user_history_by_email(supabase, user_email, history_pages)
+        # Server rows only; session inserts must not count towards a full last page
+        fetched_count = len(history)
+        
+        # Rows saved this session come first until a fetched page includes them
+        history_inserts = st.session_state.get('history_inserts') or []
+        if history_inserts:
+            fetched_ids = {item.get('id') for item in history}
+            history_inserts = [row for row in history_inserts if row.get('id') not in fetched_ids]
+            st.session_state['history_inserts'] = history_inserts
+            history = history_inserts + history
+        
+        # Index rows by ID in one pass, overlaying renames made this session
+        # (cached rows are fresh copies, so updating them is safe)
+        history_edits = st.session_state.get('history_edits') or {}
+        id_to_item = {}
+        for item in history:
+            item_id = item.get('id')
+            if item_id in history_edits:
+                item['display_name'] = history_edits[item_id]
+            id_to_item[item_id] = item
         
         if history:
             # Store selected history ID in session state
             if 'selected_history_id' not in st.session_state:
                 st.session_state.selected_history_id = None
             
-            # Create options for selectbox
-            history_options = ["Select a past application..."]
-            history_dict = {}
-            
-            for item in history:
-                job_title = item.get('job_title', 'Untitled')
-                company = item.get('company_name', '')
-                display_name = item.get('display_name', '')  # Custom display name if set
-                match_score = item.get('match_score', 0)
-                history_id = item.get('id')
-                created_at = item.get('created_at', '')
-                
-                # Format date
-                try:
-                    if created_at:
-                        date_obj = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        date_str = date_obj.strftime('%d %b %Y')
-                    else:
-                        date_str = 'Unknown date'
-                except:
-                    date_str = 'Unknown date'
-                
-                # Create display label - use custom name if set, otherwise company name first, then job title
-                if display_name:
-                    label = f"{display_name} ({match_score}/100) - {date_str}"
-                elif company:
-                    label = f"{company} - {job_title} ({match_score}/100) - {date_str}"
-                else:
-                    label = f"{job_title} ({match_score}/100) - {date_str}"
-                
-                history_options.append(label)
-                history_dict[label] = history_id
+            # Create options for selectbox (labels are cached; only the fields they use are hashed)
+            history_options, label_to_id = _format_history_options(tuple(
+                (
+                    item.get('id'),
+                    item.get('job_title', 'Untitled'),
+                    item.get('company_name', ''),
+                    item.get('display_name', ''),  # Custom display name if set
+                    item.get('match_score', 0),
+                    item.get('created_at', '')
+                )
+                for item in history
+            ))
             
             # Calculate the correct index for the selectbox based on selected_history_id
             selected_index = 0  # Default to "Select a past application..."
             if st.session_state.selected_history_id is not None:
                 # Find the index of the selected item
                 for idx, label in enumerate(history_options):
-                    if label in history_dict and history_dict[label] == st.session_state.selected_history_id:
+                    if label in label_to_id and label_to_id[label] == st.session_state.selected_history_id:
                         selected_index = idx
                         break
             
@@ -1257,8 +1619,8 @@ def render_history_sidebar(supabase, username, user_email):
             )
             
             # If a history item is selected, load it
-            if selected_label != "Select a past application..." and selected_label in history_dict:
-                history_id = history_dict[selected_label]
+            if selected_label != "Select a past application..." and selected_label in label_to_id:
+                history_id = label_to_id[selected_label]
                 
                 # Set selected history ID to trigger loading (only if different)
                 if st.session_state.selected_history_id != history_id:
@@ -1277,14 +1639,10 @@ def render_history_sidebar(supabase, username, user_email):
                         cover_letter_text = history_data.get('cover_letter', '')
                         
                         # Store in session state for display
-                        try:
-                            st.session_state.loaded_analysis = json.loads(analysis_json) if analysis_json and analysis_json.strip() else {}
-                        except json.JSONDecodeError as e:
-                            st.session_state.loaded_analysis = {}
-                        try:
-                            st.session_state.loaded_company_research = json.loads(company_research_json) if company_research_json and company_research_json.strip() else {}
-                        except json.JSONDecodeError as e:
-                            st.session_state.loaded_company_research = {}
+                        (
+                            st.session_state.loaded_analysis,
+                            st.session_state.loaded_company_research
+                        ) = _parse_history_payloads(history_id, analysis_json, company_research_json)
                         st.session_state.loaded_cover_letter = cover_letter_text
                         st.session_state.loaded_history_id = history_id
                         st.session_state.show_loaded_analysis = True  # Flag to show analysis instead of forms
@@ -1297,7 +1655,7 @@ def render_history_sidebar(supabase, username, user_email):
                 if st.session_state.selected_history_id == history_id:
                     with st.expander("✏️ Rename this application", expanded=False):
                         # Get current display name or default
-                        current_item = next((item for item in history if item.get('id') == history_id), None)
+                        current_item = id_to_item.get(history_id)
                         current_display = current_item.get('display_name', '') if current_item else ''
                         current_company = current_item.get('company_name', '') if current_item else ''
                         current_job = current_item.get('job_title', '') if current_item else ''
@@ -1328,11 +1686,16 @@ def render_history_sidebar(supabase, username, user_email):
                                     else:
                                         update_data['display_name'] = None  # Clear custom name
                                     
-                                    supabase.table('career_history').update(update_data).eq('id', history_id).eq('user_email', user_email).execute()
-                                    # Clear cache so updated name appears immediately
-                                    fetch_user_history.clear(user_email)
-                                    st.success("✅ Name updated!")
-                                    st.rerun()
+                                    # The update returns the changed row, so no follow-up select is needed
+                                    result = supabase.table('career_history').update(
+                                        update_data, returning=ReturnMethod.representation
+                                    ).eq('id', history_id).eq('user_email', user_email).execute()
+                                    # Refresh every session's history pages and overlay the stored name in this one
+                                    updated_name = result.data[0].get('display_name') if result.data else update_data['display_name']
+                                    clear_user_history_cache(user_email)
+                                    apply_history_rename(history_id, updated_name)
+                                    st.toast("✅ Name updated!")
+                                    st.rerun(scope="fragment")
                                 except Exception as e:
                                     st.error(f"❌ Failed to update: {str(e)}")
                         
@@ -1340,26 +1703,47 @@ def render_history_sidebar(supabase, username, user_email):
                             if st.button("🗑️ Clear Name", key=f"clear_name_{history_id}", use_container_width=True):
                                 # Clear display_name in database
                                 try:
-                                    supabase.table('career_history').update({'display_name': None}).eq('id', history_id).eq('user_email', user_email).execute()
-                                    # Clear cache so updated name appears immediately
-                                    fetch_user_history.clear(user_email)
-                                    st.success("✅ Name cleared!")
-                                    st.rerun()
+                                    result = supabase.table('career_history').update(
+                                        {'display_name': None}, returning=ReturnMethod.representation
+                                    ).eq('id', history_id).eq('user_email', user_email).execute()
+                                    # Refresh every session's history pages and overlay the stored row in this one
+                                    clear_user_history_cache(user_email)
+                                    apply_history_rename(history_id, result.data[0].get('display_name') if result.data else None)
+                                    st.toast("✅ Name cleared!")
+                                    st.rerun(scope="fragment")
                                 except Exception as e:
                                     st.error(f"❌ Failed to clear: {str(e)}")
+            
+            # A full last page means there may be older entries to fetch
+            if fetched_count >= history_pages * HISTORY_PAGE_SIZE:
+                if st.button("Load more", key="history_load_more", use_container_width=True):
+                    st.session_state.history_pages = history_pages + 1
+                    st.rerun()
         else:
             st.info("No previous analyses yet. Run your first analysis to see it here!")
     else:
         st.warning("⚠️ Supabase not configured. Add SUPABASE_URL and SUPABASE_KEY to secrets.")
 
 
+ANALYSIS_SECTIONS = ["🎯 Skill Gap Analysis", "🎤 Interview Prep", "✍️ CV Improvements", "🏢 Company Intelligence", "📝 Cover Letter"]
+
+
 @st.fragment
-def render_analysis_tabs(gemini_analysis, company_research=None, cover_letter_text=None):
-    """Render the Gemini analysis tabs as a fragment."""
-    # Tabs for different sections
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🎯 Skill Gap Analysis", "🎤 Interview Prep", "✍️ CV Improvements", "🏢 Company Intelligence", "📝 Cover Letter"])
+def render_analysis_tabs(gemini_analysis, company_research=None, cover_letter_text=None, key: str = "analysis"):
+    """
+    Render the Gemini analysis sections as a fragment.
+    Only the selected section is built, and switching sections reruns just this fragment.
+    """
+    # Section picker (st.tabs would build every section's elements on each rerun)
+    active_section = st.radio(
+        "Section",
+        ANALYSIS_SECTIONS,
+        key=f"{key}_active_section",
+        horizontal=True,
+        label_visibility="collapsed"
+    )
     
-    with tab1:
+    if active_section == ANALYSIS_SECTIONS[0]:
         st.markdown("### Missing Hard Skills")
         missing_skills = gemini_analysis.get('missing_hard_skills', [])
         if missing_skills:
@@ -1372,7 +1756,7 @@ def render_analysis_tabs(gemini_analysis, company_research=None, cover_letter_te
         st.markdown("### 💡 Why This Matters")
         st.info("These are the specific technical skills the recruiter will be looking for. Consider highlighting related experience or upskilling in these areas.")
     
-    with tab2:
+    elif active_section == ANALYSIS_SECTIONS[1]:
         st.markdown("### 🎯 Tough Interview Questions")
         st.markdown("These questions are designed to probe your skill gaps. Prepare strong, honest answers.")
         
@@ -1389,7 +1773,7 @@ def render_analysis_tabs(gemini_analysis, company_research=None, cover_letter_te
         st.markdown("### 🎤 Interview Strategy")
         st.success("Use these questions to prepare your responses. Focus on demonstrating growth mindset and willingness to learn missing skills.")
     
-    with tab3:
+    elif active_section == ANALYSIS_SECTIONS[2]:
         st.markdown("### ✍️ Power Word Swaps")
         st.markdown("Replace generic buzzwords with high-impact UK action verbs to make your CV stand out.")
         
@@ -1418,7 +1802,7 @@ def render_analysis_tabs(gemini_analysis, company_research=None, cover_letter_te
         else:
             st.info("No specific CV improvements suggested.")
     
-    with tab4:
+    elif active_section == ANALYSIS_SECTIONS[3]:
         # Company Intelligence
         st.markdown("### 🏢 Company Intelligence")
         st.markdown("Research insights to help you stand out in your interview.")
@@ -1451,7 +1835,7 @@ def render_analysis_tabs(gemini_analysis, company_research=None, cover_letter_te
         else:
             st.info("Company research not available.")
     
-    with tab5:
+    elif active_section == ANALYSIS_SECTIONS[4]:
         st.markdown("### 📝 Personalized Cover Letter")
         if cover_letter_text:
             st.text_area(
@@ -1471,6 +1855,198 @@ def render_analysis_tabs(gemini_analysis, company_research=None, cover_letter_te
             st.info("Cover letter not available for this analysis.")
 
 
+def get_psychometric_assessment() -> PsychometricAssessment:
+    """Return this session's assessment, building it on first use."""
+    if st.session_state.get('psychometric_assessment') is None:
+        st.session_state.psychometric_assessment = PsychometricAssessment()
+    return st.session_state.psychometric_assessment
+
+
+@st.fragment
+def render_psychometric_assessment(supabase, user_email):
+    """
+    Render the career values assessment as a fragment.
+    Answering a question reruns only this fragment; Compare and Coach reads the profile from session state.
+    """
+    st.markdown("### Career Values Assessment")
+    st.markdown("Complete this assessment to help us understand your career values and personality.")
+    
+    # Check if assessment is already completed
+    if st.session_state.assessment_completed:
+        st.success("✅ Assessment completed!")
+        with st.expander("View Your Personality Profile"):
+            profile = get_psychometric_assessment().personality_profile
+            if profile:
+                st.markdown("**Top Personality Traits:**")
+                for trait, score in profile.get('top_traits', [])[:5]:
+                    st.markdown(f"- {trait.capitalize()}: {score} points")
+                
+                st.markdown(f"**Communication Style:** {profile.get('communication_style', 'N/A')}")
+                st.markdown(f"**Work Style:** {profile.get('work_style', 'N/A')}")
+                st.markdown(f"**Motivation Style:** {profile.get('motivation_style', 'N/A')}")
+        
+        if st.button("Retake Assessment"):
+            st.session_state.psychometric_assessment = None
+            st.session_state.assessment_completed = False
+            st.rerun(scope="fragment")
+    else:
+        # Display questions one at a time
+        assessment = get_psychometric_assessment()
+        questions = assessment.questions
+        responses = assessment.responses
+        
+        # Find the current question (first unanswered)
+        current_q_id = None
+        for q in questions:
+            if q['id'] not in responses:
+                current_q_id = q['id']
+                break
+        
+        if current_q_id:
+            current_question = next(q for q in questions if q['id'] == current_q_id)
+            
+            st.markdown(f"**Question {current_q_id} of {len(questions)}**")
+            st.markdown(f"**{current_question['question']}**")
+            
+            # Create radio buttons for options
+            selected_option = st.radio(
+                "Select your answer:",
+                options=['a', 'b', 'c', 'd'],
+                format_func=lambda x: current_question['options'][x],
+                key=f"question_{current_q_id}"
+            )
+            
+            if st.button("Next Question", type="primary"):
+                assessment.responses[current_q_id] = selected_option
+                st.rerun(scope="fragment")
+        else:
+            # All questions answered, calculate profile
+            assessment._calculate_personality_profile()
+            st.session_state.assessment_completed = True
+            
+            # Save assessment results to database
+            if supabase and user_email:
+                personality_profile = get_psychometric_assessment().personality_profile
+                if personality_profile:
+                    save_success = save_psychometric_assessment(supabase, user_email, personality_profile)
+                    if save_success:
+                        st.toast("✅ Assessment results saved successfully!")
+            
+            st.rerun(scope="fragment")
+
+
+# Immutable session defaults for the logged-in UI
+_SESSION_DEFAULTS = {
+    'cv_text': "",
+    'job_url': "",
+    'job_description': "",
+    'show_loaded_analysis': False,
+}
+
+
+def render_dashboard_metrics(gemini_analysis: dict):
+    """Render the current match, potential match and salary metrics row."""
+    # Top metrics in columns
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        match_score = gemini_analysis.get('match_score', 0)
+        st.metric("📊 Current CV Match", f"{match_score}/100", delta=f"{match_score - 50}" if match_score >= 50 else None)
+        st.caption("Your current match score")
+    
+    with col2:
+        potential_score = calculate_potential_match_score(gemini_analysis)
+        improvement = potential_score - match_score
+        delta_label = f"+{improvement}" if improvement > 0 else None
+        st.metric("🚀 Potential Match", f"{potential_score}/100", delta=delta_label, delta_color="normal")
+        st.caption("With suggested improvements")
+    
+    with col3:
+        salary_range = gemini_analysis.get('salary_range', 'N/A')
+        st.metric("💷 UK Salary Benchmark", salary_range)
+        st.caption("Estimated salary range")
+
+
+def render_loaded_dashboard(gemini_analysis: dict, company_research=None, cover_letter_text=None):
+    """Render the Career Strategy Dashboard for an analysis loaded from history."""
+    st.markdown("## 🚀 Career Strategy Dashboard (Loaded from History)")
+    st.markdown("---")
+    
+    render_dashboard_metrics(gemini_analysis)
+    
+    st.markdown("---")
+    
+    # Render analysis tabs as fragment
+    render_analysis_tabs(gemini_analysis, company_research, cover_letter_text, key="history_analysis")
+
+
+@st.fragment
+def render_registration_form(supabase):
+    """Render the registration expander as a fragment, so typing in it doesn't rerun the whole app."""
+    with st.expander("New User? Register Here"):
+        try:
+            st.markdown("### Create Your Account")
+            reg_username = st.text_input("Username", key="reg_username", help="Choose a unique username")
+            reg_name = st.text_input("Full Name", key="reg_name", help="Enter your full name")
+            reg_email = st.text_input("Email", key="reg_email", help="Enter your email address")
+            reg_password = st.text_input("Password", type="password", key="reg_password", help="Choose a secure password")
+            reg_password_confirm = st.text_input("Confirm Password", type="password", key="reg_password_confirm", help="Re-enter your password")
+            
+            if st.button("Register", key="register_button", type="primary"):
+                if not reg_username or not reg_name or not reg_email or not reg_password:
+                    st.error("Please fill in all fields.")
+                elif not USERNAME_RE.fullmatch(reg_username):
+                    st.error("Username may only contain letters, numbers, '.', '_', '-' and '@' (up to 64 characters).")
+                elif reg_password != reg_password_confirm:
+                    st.error("Passwords do not match.")
+                elif len(reg_password) < 6:
+                    st.error("Password must be at least 6 characters long.")
+                else:
+                    with st.spinner("Creating account..."):
+                        password_hash = hash_password(reg_password)
+                    
+                    if supabase:
+                        if save_user_to_database(supabase, reg_username, reg_name, password_hash, reg_email):
+                            st.success("✅ Registration successful! Please log in with your new credentials.")
+                            load_users_from_database.clear()
+                            _fetch_user_row.clear(supabase, reg_username.lower())
+                            _cached_user_email.clear(reg_username)
+                            st.session_state['reload_auth'] = True
+                        else:
+                            st.error("❌ Registration failed. Username may already exist.")
+                    else:
+                        st.error("❌ Database not available. Please check your configuration.")
+        except Exception as e:
+            st.error(f"Registration error: {str(e)}")
+
+
+@st.fragment
+def render_login_form(supabase):
+    """Render the login form as a fragment; a successful login reruns the full app."""
+    # Only show this form since authenticator login doesn't work in this setup
+    st.markdown("---")
+    st.write("**Please log in:**")
+    with st.form("login_form", clear_on_submit=False):
+        username_input = st.text_input("Username", key="fallback_username")
+        password_input = st.text_input("Password", type="password", key="fallback_password")
+        submit_button = st.form_submit_button("Login", type="primary", use_container_width=True)
+        
+        if submit_button:
+            with st.spinner("Signing in..."):
+                is_authenticated, user_data = authenticate_user_from_database(supabase, username_input, password_input)
+            
+            if is_authenticated and user_data:
+                st.session_state['authenticated'] = True
+                st.session_state['name'] = user_data['name']
+                st.session_state['username'] = user_data['username']
+                st.session_state['user_email'] = user_data['email']
+                st.session_state['authentication_status'] = True  # Also set this for consistency
+                # Leave the fragment and rerun the whole app into the authenticated view
+                st.rerun(scope="app")
+            else:
+                st.error("Invalid username or password")
+
+
 def main():
     """Main Streamlit application."""
     
@@ -1513,74 +2089,22 @@ def main():
         username = None
     
     # Store authentication_status in session state
-    was_authenticated = st.session_state.get('authentication_status', False)
+    # (no extra rerun when it flips to True: the authenticated UI below renders in this same run)
     st.session_state['authentication_status'] = authentication_status
     
-    # If authentication_status just became True, rerun to refresh the page
-    if authentication_status and not was_authenticated:
-        st.rerun()
-    
     # If not authenticated, show login page
     if not authentication_status:
         st.title("💼 Career Coach - Login")
         st.markdown("Please log in to access the Career Coach application.")
         
+        # One shared client for both registration and login
+        supabase = get_supabase_client()
+        
         # Registration section
-        with st.expander("New User? Register Here"):
-            try:
-                supabase = get_supabase_client()
-                
-                st.markdown("### Create Your Account")
-                reg_username = st.text_input("Username", key="reg_username", help="Choose a unique username")
-                reg_name = st.text_input("Full Name", key="reg_name", help="Enter your full name")
-                reg_email = st.text_input("Email", key="reg_email", help="Enter your email address")
-                reg_password = st.text_input("Password", type="password", key="reg_password", help="Choose a secure password")
-                reg_password_confirm = st.text_input("Confirm Password", type="password", key="reg_password_confirm", help="Re-enter your password")
-                
-                if st.button("Register", key="register_button", type="primary"):
-                    if not reg_username or not reg_name or not reg_email or not reg_password:
-                        st.error("Please fill in all fields.")
-                    elif reg_password != reg_password_confirm:
-                        st.error("Passwords do not match.")
-                    elif len(reg_password) < 6:
-                        st.error("Password must be at least 6 characters long.")
-                    else:
-                        password_hash = stauth.Hasher([reg_password]).generate()[0]
-                        
-                        if supabase:
-                            if save_user_to_database(supabase, reg_username, reg_name, password_hash, reg_email):
-                                st.success("✅ Registration successful! Please log in with your new credentials.")
-                                st.session_state['reload_auth'] = True
-                            else:
-                                st.error("❌ Registration failed. Username may already exist.")
-                        else:
-                            st.error("❌ Database not available. Please check your configuration.")
-            except Exception as e:
-                st.error(f"Registration error: {str(e)}")
+        render_registration_form(supabase)
         
         # Single login form (fallback method)
-        # Only show this form since authenticator login doesn't work in this setup
-        st.markdown("---")
-        st.write("**Please log in:**")
-        with st.form("login_form", clear_on_submit=False):
-            username_input = st.text_input("Username", key="fallback_username")
-            password_input = st.text_input("Password", type="password", key="fallback_password")
-            submit_button = st.form_submit_button("Login", type="primary", use_container_width=True)
-            
-            if submit_button:
-                supabase = get_supabase_client()
-                is_authenticated, user_data = authenticate_user_from_database(supabase, username_input, password_input)
-                
-                if is_authenticated and user_data:
-                    st.session_state['authenticated'] = True
-                    st.session_state['name'] = user_data['name']
-                    st.session_state['username'] = user_data['username']
-                    st.session_state['user_email'] = user_data['email']
-                    st.session_state['authentication_status'] = True  # Also set this for consistency
-                    st.rerun()
-                    return  # Prevent further execution after rerun
-                else:
-                    st.error("Invalid username or password")
+        render_login_form(supabase)
         
         st.stop()
         return
@@ -1594,7 +2118,7 @@ def main():
     if auth_check_result:
         # Get user email from database and store in session state for privacy filtering
         supabase = get_supabase_client()
-        user_email = get_user_email_from_database(supabase, username)
+        user_email = get_user_email_from_database(username)
         st.session_state['user_email'] = user_email
         
         # Add logout button and Application History in sidebar
@@ -1604,8 +2128,7 @@ def main():
             # Logout button - use custom logout since we're using fallback authentication
             if st.button('Logout', key='custom_logout'):
                 # Clear all session state on logout
-                for key in list(st.session_state.keys()):
-                    del st.session_state[key]
+                st.session_state.clear()
                 # Explicitly reset authentication flags
                 st.session_state['authenticated'] = False
                 st.session_state['authentication_status'] = False
@@ -1614,9 +2137,7 @@ def main():
                 st.rerun()
                 return  # Prevent further execution
             
-            # Initialize Supabase client
-            supabase = get_supabase_client()
-            user_email = st.session_state.get('user_email') or get_user_email_from_database(supabase, username) if supabase else None
+            user_email = st.session_state.get('user_email') or get_user_email_from_database(username) if supabase else None
             
             # Render history sidebar as fragment
             render_history_sidebar(supabase, username, user_email)
@@ -1626,24 +2147,18 @@ def main():
         st.markdown("Compare your CV against job listings and get personalized improvement suggestions.")
         
         # Initialize session state
-        if 'cv_text' not in st.session_state:
-            st.session_state.cv_text = ""
-        if 'psychometric_assessment' not in st.session_state:
-            st.session_state.psychometric_assessment = PsychometricAssessment()
+        for key, default in _SESSION_DEFAULTS.items():
+            st.session_state.setdefault(key, default)
+        # The assessment itself is built on first use by get_psychometric_assessment()
+        st.session_state.setdefault('psychometric_assessment', None)
         if 'assessment_completed' not in st.session_state:
             st.session_state.assessment_completed = False
             # Try to load saved assessment from database
             if supabase and user_email:
                 saved_profile = load_psychometric_assessment(supabase, user_email)
                 if saved_profile:
-                    st.session_state.psychometric_assessment.personality_profile = saved_profile
+                    get_psychometric_assessment().personality_profile = saved_profile
                     st.session_state.assessment_completed = True
-        if 'job_url' not in st.session_state:
-            st.session_state.job_url = ""
-        if 'job_description' not in st.session_state:
-            st.session_state.job_description = ""
-        if 'show_loaded_analysis' not in st.session_state:
-            st.session_state.show_loaded_analysis = False
     
     # Check if we should show loaded analysis instead of input forms
     if st.session_state.get('show_loaded_analysis', False) and 'loaded_analysis' in st.session_state and st.session_state.loaded_analysis is not None:
@@ -1652,34 +2167,7 @@ def main():
         company_research = st.session_state.loaded_company_research if 'loaded_company_research' in st.session_state else {}
         cover_letter_text = st.session_state.loaded_cover_letter if 'loaded_cover_letter' in st.session_state else None
         
-        # Display loaded analysis
-        st.markdown("## 🚀 Career Strategy Dashboard (Loaded from History)")
-        st.markdown("---")
-        
-        # Top metrics in columns
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            match_score = gemini_analysis.get('match_score', 0)
-            st.metric("📊 Current CV Match", f"{match_score}/100", delta=f"{match_score - 50}" if match_score >= 50 else None)
-            st.caption("Your current match score")
-        
-        with col2:
-            potential_score = calculate_potential_match_score(gemini_analysis)
-            improvement = potential_score - match_score
-            delta_label = f"+{improvement}" if improvement > 0 else None
-            st.metric("🚀 Potential Match", f"{potential_score}/100", delta=delta_label, delta_color="normal")
-            st.caption("With suggested improvements")
-        
-        with col3:
-            salary_range = gemini_analysis.get('salary_range', 'N/A')
-            st.metric("💷 UK Salary Benchmark", salary_range)
-            st.caption("Estimated salary range")
-        
-        st.markdown("---")
-        
-        # Render analysis tabs as fragment
-        render_analysis_tabs(gemini_analysis, company_research, cover_letter_text)
+        render_loaded_dashboard(gemini_analysis, company_research, cover_letter_text)
         
         # Button to go back to input forms
         st.markdown("---")
@@ -1709,15 +2197,7 @@ def main():
         
         if cv_file:
             try:
-                file_bytes = cv_file.read()
-                cv_text = ""
-                
-                if cv_file.type == "application/pdf":
-                    pdf_file = io.BytesIO(file_bytes)
-                    cv_text = extract_text_from_pdf(pdf_file)
-                elif cv_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                    docx_file = io.BytesIO(file_bytes)
-                    cv_text = extract_text_from_docx(docx_file)
+                cv_text = extract_cv_text(cv_file)
                 
                 if cv_text:
                     st.session_state.cv_text = cv_text
@@ -1726,133 +2206,41 @@ def main():
                 st.error(f"Error extracting text from file: {str(e)}")
         
         # Psychometric Assessment
-        st.markdown("### Career Values Assessment")
-        st.markdown("Complete this assessment to help us understand your career values and personality.")
-        
-        # Check if assessment is already completed
-        if st.session_state.assessment_completed:
-            st.success("✅ Assessment completed!")
-            with st.expander("View Your Personality Profile"):
-                profile = st.session_state.psychometric_assessment.personality_profile
-                if profile:
-                    st.markdown("**Top Personality Traits:**")
-                    for trait, score in profile.get('top_traits', [])[:5]:
-                        st.markdown(f"- {trait.capitalize()}: {score} points")
-                    
-                    st.markdown(f"**Communication Style:** {profile.get('communication_style', 'N/A')}")
-                    st.markdown(f"**Work Style:** {profile.get('work_style', 'N/A')}")
-                    st.markdown(f"**Motivation Style:** {profile.get('motivation_style', 'N/A')}")
-            
-            if st.button("Retake Assessment"):
-                st.session_state.psychometric_assessment = PsychometricAssessment()
-                st.session_state.assessment_completed = False
-                st.rerun()
-        else:
-            # Display questions one at a time
-            questions = st.session_state.psychometric_assessment.questions
-            responses = st.session_state.psychometric_assessment.responses
-            
-            # Find the current question (first unanswered)
-            current_q_id = None
-            for q in questions:
-                if q['id'] not in responses:
-                    current_q_id = q['id']
-                    break
-            
-            if current_q_id:
-                current_question = next(q for q in questions if q['id'] == current_q_id)
-                
-                st.markdown(f"**Question {current_q_id} of {len(questions)}**")
-                st.markdown(f"**{current_question['question']}**")
-                
-                # Create radio buttons for options
-                selected_option = st.radio(
-                    "Select your answer:",
-                    options=['a', 'b', 'c', 'd'],
-                    format_func=lambda x: current_question['options'][x],
-                    key=f"question_{current_q_id}"
-                )
-                
-                if st.button("Next Question", type="primary"):
-                    st.session_state.psychometric_assessment.responses[current_q_id] = selected_option
-                    st.rerun()
-            else:
-                # All questions answered, calculate profile
-                st.session_state.psychometric_assessment._calculate_personality_profile()
-                st.session_state.assessment_completed = True
-                
-                # Save assessment results to database
-                if supabase and user_email:
-                    personality_profile = st.session_state.psychometric_assessment.personality_profile
-                    if personality_profile:
-                        save_success = save_psychometric_assessment(supabase, user_email, personality_profile)
-                        if save_success:
-                            st.toast("✅ Assessment results saved successfully!")
-                
-                st.rerun()
+        render_psychometric_assessment(supabase, user_email)
     
     # Right column: The Job
     with col2:
         st.header("The Job")
         
-        # Job URL text input
-        job_url = st.text_input(
-            "Job URL",
-            placeholder="https://example.com/job-listing",
-            help="Enter the URL of the job listing (optional)"
-        )
+        # The job inputs are a form, so editing them doesn't rerun the script until Compare and Coach
+        # (the CV uploader and assessment stay outside: forms can't hold their buttons)
+        with st.form("job_inputs", clear_on_submit=False, border=False):
+            # Job URL text input
+            job_url = st.text_input(
+                "Job URL",
+                placeholder="https://example.com/job-listing",
+                help="Enter the URL of the job listing (optional)"
+            )
+            
+            # Job Description text area
+            job_description = st.text_area(
+                "Job Description",
+                height=200,
+                placeholder="Paste the job description here...",
+                help="Enter or paste the full job description"
+            )
+            
+            compare_clicked = st.form_submit_button("Compare and Coach", type="primary", use_container_width=True)
         st.session_state.job_url = job_url
-        
-        # Job Description text area
-        job_description = st.text_area(
-            "Job Description",
-            height=200,
-            placeholder="Paste the job description here...",
-            help="Enter or paste the full job description"
-        )
         st.session_state.job_description = job_description
     
     # History loading is now handled by the render_history_sidebar fragment
     
-    # Compare and Coach button at the bottom
+    # Results of Compare and Coach appear below the inputs
+    # (a loaded history analysis is rendered by render_loaded_dashboard above, which stops the script)
     st.markdown("---")
     
-    # Check if we have a loaded analysis to display
-    if 'loaded_analysis' in st.session_state and st.session_state.loaded_analysis:
-        gemini_analysis = st.session_state.loaded_analysis
-        company_research = st.session_state.loaded_company_research if 'loaded_company_research' in st.session_state else {}
-        cover_letter_text = st.session_state.loaded_cover_letter if 'loaded_cover_letter' in st.session_state else None
-        
-        # Display loaded analysis
-        st.markdown("## 🚀 Career Strategy Dashboard (Loaded from History)")
-        st.markdown("---")
-        
-        # Top metrics in columns
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            match_score = gemini_analysis.get('match_score', 0)
-            st.metric("📊 Current CV Match", f"{match_score}/100", delta=f"{match_score - 50}" if match_score >= 50 else None)
-            st.caption("Your current match score")
-        
-        with col2:
-            potential_score = calculate_potential_match_score(gemini_analysis)
-            improvement = potential_score - match_score
-            delta_label = f"+{improvement}" if improvement > 0 else None
-            st.metric("🚀 Potential Match", f"{potential_score}/100", delta=delta_label, delta_color="normal")
-            st.caption("With suggested improvements")
-        
-        with col3:
-            salary_range = gemini_analysis.get('salary_range', 'N/A')
-            st.metric("💷 UK Salary Benchmark", salary_range)
-            st.caption("Estimated salary range")
-        
-        st.markdown("---")
-        
-        # Render analysis tabs as fragment
-        render_analysis_tabs(gemini_analysis, company_research, cover_letter_text)
-    
-    if st.button("Compare and Coach", type="primary", use_container_width=True):
+    if compare_clicked:
         # Extract all text
         cv_text_extracted = st.session_state.cv_text
         job_url_text = st.session_state.job_url
@@ -1861,7 +2249,7 @@ def main():
         # Get psychometric assessment results
         assessment_profile = None
         if st.session_state.assessment_completed:
-            assessment_profile = st.session_state.psychometric_assessment.personality_profile
+            assessment_profile = get_psychometric_assessment().personality_profile
         
         # If URL is provided, try to extract text from it
         job_text_from_url = ""
@@ -1877,225 +2265,103 @@ def main():
         has_job_data = bool(final_job_text.strip())
         
         if has_cv and has_job_data:
-            # Call Gemini analysis with streaming
+            # The analysis, company research and cover letter are independent, so all three
+            # Gemini calls stream at once and the wait is the slowest call instead of their sum
+            company_name = extract_company_name(job_url_text, final_job_text)
+            
             st.markdown("### 🤖 Analysing CV with elite UK Headhunter...")
+            analysis_placeholder = st.empty()
+            st.markdown(f"### 🔍 Researching {company_name}...")
+            research_placeholder = st.empty()
+            st.markdown("### ✍️ Drafting cover letter...")
+            cover_letter_placeholder = st.empty()
+            placeholders = [analysis_placeholder, research_placeholder, cover_letter_placeholder]
             
-            # Collect response while streaming
-            response_text = ""
-            def collect_and_stream():
-                nonlocal response_text
-                for chunk in _stream_gemini_analysis(cv_text_extracted, final_job_text):
-                    response_text += chunk
-                    yield chunk
+            # Re-running with unchanged inputs reuses the last outputs instead of calling Gemini again
+            inputs_key = gemini_inputs_key(
+                cv_text_extracted, final_job_text, job_url_text, company_name,
+                _json_dumps(assessment_profile) if assessment_profile else ''
+            )
+            # Error message per stream (analysis, research, cover letter); one failure leaves the others intact
+            stream_errors = [None, None, None]
+            cached_outputs = get_gemini_response_cache().get(inputs_key)
+            if cached_outputs is not None:
+                for placeholder, text in zip(placeholders, cached_outputs):
+                    placeholder.markdown(text)
+                outputs = list(cached_outputs)
+            else:
+                # Secrets and the cached model are resolved here on the script thread, since the streams
+                # are iterated in worker threads that have no Streamlit script context
+                api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
+                if not api_key:
+                    outputs = ["", "", ""]
+                    stream_errors = ["Google API key not found. Please set GEMINI_API_KEY environment variable or add it to Streamlit secrets."] * 3
+                else:
+                    model = _get_gemini_model(api_key)
+                    outputs = write_streams_concurrently(
+                        [
+                            _stream_gemini_analysis(cv_text_extracted, final_job_text, model=model),
+                            _stream_company_research(company_name, job_url_text, final_job_text, model=model),
+                            _stream_cover_letter(cv_text_extracted, final_job_text, assessment_profile, model=model)
+                        ],
+                        placeholders
+                    )
+                    for i, output in enumerate(outputs):
+                        if isinstance(output, Exception):
+                            stream_errors[i] = str(output)
+                            outputs[i] = ""
+            response_text, research_response_text, cover_letter_text = outputs
             
-            st.write_stream(collect_and_stream())
+            # Research and cover letter failures are shown in their own sections; analysis errors below
+            if stream_errors[1]:
+                research_placeholder.error(f"❌ Error generating company research: {stream_errors[1]}")
+            if stream_errors[2]:
+                cover_letter_placeholder.error(f"❌ Error generating cover letter: {stream_errors[2]}")
+                cover_letter_text = f"Error generating cover letter: {stream_errors[2]}"
             
             # Parse the collected response
             gemini_analysis = None
             try:
-                response_text = response_text.strip()
-                # Try to extract JSON from the response
-                json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1)
+                if stream_errors[0]:
+                    gemini_analysis = {"error": f"Error generating analysis: {stream_errors[0]}"}
                 else:
-                    # Try to find JSON object directly
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    if json_match:
-                        response_text = json_match.group(0)
-                
-                # Parse JSON
-                gemini_analysis = json.loads(response_text)
+                    gemini_analysis = _parse_json_response(response_text)
             except json.JSONDecodeError as e:
                 gemini_analysis = {"error": f"Failed to parse JSON response: {str(e)}", "raw_response": response_text}
             except Exception as e:
                 gemini_analysis = {"error": f"Error in get_gemini_analysis: {str(e)}"}
             
-            # Check for errors
+            # Check for errors, reported in the analysis section
             if gemini_analysis is None:
-                st.error("❌ Failed to get analysis from Gemini. Please check your API key and try again.")
+                analysis_placeholder.error("❌ Failed to get analysis from Gemini. Please check your API key and try again.")
             elif "error" in gemini_analysis:
-                st.error(f"❌ {gemini_analysis['error']}")
+                analysis_placeholder.error(f"❌ {gemini_analysis['error']}")
                 if "raw_response" in gemini_analysis:
                     with st.expander("View Raw Response"):
                         st.text(gemini_analysis['raw_response'])
             else:
-                # Get company research and cover letter
-                company_research = {}
-                cover_letter_text = None
-                
-                # Extract company name and get research
-                company_name = extract_company_name(job_url_text, final_job_text)
-                st.markdown(f"### 🔍 Researching {company_name}...")
-                
-                # Collect response while streaming
-                research_response_text = ""
-                def collect_and_stream_research():
-                    nonlocal research_response_text
-                    api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
-                    if not api_key:
-                        yield "Error: Google API key not found."
-                        return
-                    
-                    genai.configure(api_key=api_key)
-                    model = genai.GenerativeModel('gemini-2.5-flash')
-                    
-                    context_info = ""
-                    if job_url_text:
-                        context_info += f"\nJob URL: {job_url_text}"
-                    if final_job_text:
-                        context_info += f"\nJob Description (first 500 chars): {final_job_text[:500]}"
-                    
-                    prompt = f"""Research the following company and provide comprehensive intelligence for a job interview candidate.
-
-Company Name: {company_name}
-{context_info}
-
-Provide your research in the following JSON format:
-{{
-    "company_name": "{company_name}",
-    "financial_performance": {{
-        "market_position": "<description of current market position>",
-        "financial_health": "<recent financial health, funding rounds, profit trends, or share price if public>",
-        "key_metrics": "<any relevant financial metrics or indicators>"
-    }},
-    "recent_news": [
-        {{
-            "headline": "<headline 1>",
-            "summary": "<brief summary>",
-            "significance": "<why this matters>"
-        }},
-        {{
-            "headline": "<headline 2>",
-            "summary": "<brief summary>",
-            "significance": "<why this matters>"
-        }},
-        {{
-            "headline": "<headline 3>",
-            "summary": "<brief summary>",
-            "significance": "<why this matters>"
-        }}
-    ],
-    "interview_deep_dive": [
-        "<Specific thing 1 to research on company website or LinkedIn>",
-        "<Specific thing 2 to research on company website or LinkedIn>",
-        "<Specific thing 3 to research on company website or LinkedIn>",
-        "<Specific thing 4 to research on company website or LinkedIn>",
-        "<Specific thing 5 to research on company website or LinkedIn>"
-    ]
-}}
-
-IMPORTANT: 
-- Be specific and actionable in your research
-- Focus on recent information (last 12-18 months)
-- For financial performance, estimate based on available public information
-- For interview deep-dive items, be specific about what to look for (e.g., "Check their 'About Us' page for their mission statement and note their core values")
-- Return ONLY valid JSON. Do not include any text before or after the JSON."""
-                    
-                    response = model.generate_content(prompt, stream=True)
-                    for chunk in response:
-                        if chunk.text:
-                            research_response_text += chunk.text
-                            yield chunk.text
-                
-                st.write_stream(collect_and_stream_research())
-                
                 # Parse the collected research response
+                company_research = {}
                 try:
-                    research_response_text = research_response_text.strip()
-                    json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', research_response_text, re.DOTALL)
-                    if json_match:
-                        research_response_text = json_match.group(1)
+                    if stream_errors[1]:
+                        company_research = {"error": f"Error generating company research: {stream_errors[1]}"}
                     else:
-                        json_match = re.search(r'\{.*\}', research_response_text, re.DOTALL)
-                        if json_match:
-                            research_response_text = json_match.group(0)
-                    
-                    company_research = json.loads(research_response_text)
+                        company_research = _parse_json_response(research_response_text)
                 except json.JSONDecodeError as e:
-                    company_research = {"error": f"Failed to parse JSON response: {str(e)}", "raw_response": research_response_text if 'research_response_text' in locals() else "No response"}
+                    company_research = {"error": f"Failed to parse JSON response: {str(e)}", "raw_response": research_response_text}
                 except Exception as e:
                     company_research = {"error": f"Error generating company research: {str(e)}"}
                 
-                # Generate cover letter
-                st.markdown("### ✍️ Drafting cover letter...")
-                
-                # Collect response while streaming
-                cover_letter_text = ""
-                def collect_and_stream_cover_letter():
-                    nonlocal cover_letter_text
-                    api_key = os.getenv('GEMINI_API_KEY') or st.secrets.get('GEMINI_API_KEY', None)
-                    if not api_key:
-                        yield "Error: Google API key not found."
-                        return
-                    
-                    genai.configure(api_key=api_key)
-                    model = genai.GenerativeModel('gemini-2.5-flash')
-                    
-                    personality_context = ""
-                    if assessment_profile:
-                        top_traits = [trait for trait, _ in assessment_profile.get('top_traits', [])[:3]]
-                        comm_style = assessment_profile.get('communication_style', '')
-                        work_style = assessment_profile.get('work_style', '')
-                        motivation_style = assessment_profile.get('motivation_style', '')
-                        
-                        personality_context = f"""
-IMPORTANT - Use this personality profile to tailor the language and tone:
-- Top Personality Traits: {', '.join(top_traits)}
-- Communication Style: {comm_style}
-- Work Style: {work_style}
-- Motivation Style: {motivation_style}
-
-Write the cover letter using language that reflects these traits. For example:
-- If communication style is 'direct and concise', use clear, straightforward language
-- If work style is 'collaborative team player', emphasize teamwork and collaboration
-- If motivation style is 'results-driven', focus on achievements and outcomes
-- Match the tone to their personality traits naturally
-"""
-                    else:
-                        personality_context = """
-Use professional, engaging language suitable for a UK job application. 
-Write in a confident but not overly formal tone.
-"""
-                    
-                    prompt = f"""You are an expert UK career coach and cover letter writer. Draft a compelling cover letter for this job application.
-
-CV Text:
-{cv_text_extracted[:2000]}
-
-Job Description:
-{final_job_text[:2000]}
-
-{personality_context}
-
-Requirements:
-1. Write a professional UK-style cover letter (3-4 paragraphs)
-2. Address the letter appropriately (use "Dear Hiring Manager" if no specific name is provided)
-3. Start with a strong opening that shows genuine interest in the role
-4. Highlight 2-3 key experiences from the CV that align with the job requirements
-5. Demonstrate understanding of the company/role by referencing specific aspects from the job description
-6. Close with enthusiasm and a clear call to action
-7. Keep it concise, professional, and impactful
-8. Use UK English spelling and conventions
-9. The language should match the personality profile provided (if available)
-
-Format the cover letter as a proper business letter with appropriate spacing and structure."""
-                    
-                    response = model.generate_content(prompt, stream=True)
-                    for chunk in response:
-                        if chunk.text:
-                            cover_letter_text += chunk.text
-                            yield chunk.text
-                
-                st.write_stream(collect_and_stream_cover_letter())
+                # Only complete, successful outputs are reused
+                if "error" not in company_research and not cover_letter_text.startswith("Error"):
+                    get_gemini_response_cache().set(inputs_key, (response_text, research_response_text, cover_letter_text))
                 
                 # Extract job title
                 job_title = extract_job_title(final_job_text)
                 
                 # Save to Supabase
-                supabase = get_supabase_client()
                 if supabase:
-                    user_email = st.session_state.get('user_email') or get_user_email_from_database(supabase, username)
+                    user_email = st.session_state.get('user_email') or get_user_email_from_database(username)
                     save_success, error_message = save_analysis_to_supabase(
                         supabase, 
                         username, 
@@ -2107,8 +2373,7 @@ Format the cover letter as a proper business letter with appropriate spacing and
                         email=user_email
                     )
                     if save_success:
-                        # Clear cache so new analysis appears in history immediately
-                        fetch_user_history.clear(user_email)
+                        # The saved row is already in the session's history (apply_history_insert)
                         st.success("💾 Analysis saved to Application History!")
                     else:
                         st.error(f"❌ Failed to save: {error_message}")
@@ -2117,25 +2382,7 @@ Format the cover letter as a proper business letter with appropriate spacing and
                 st.markdown("## 🚀 Career Strategy Dashboard")
                 st.markdown("---")
                 
-                # Top metrics in columns
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    match_score = gemini_analysis.get('match_score', 0)
-                    st.metric("📊 Current CV Match", f"{match_score}/100", delta=f"{match_score - 50}" if match_score >= 50 else None)
-                    st.caption("Your current match score")
-                
-                with col2:
-                    potential_score = calculate_potential_match_score(gemini_analysis)
-                    improvement = potential_score - match_score
-                    delta_label = f"+{improvement}" if improvement > 0 else None
-                    st.metric("🚀 Potential Match", f"{potential_score}/100", delta=delta_label, delta_color="normal")
-                    st.caption("With suggested improvements")
-                
-                with col3:
-                    salary_range = gemini_analysis.get('salary_range', 'N/A')
-                    st.metric("💷 UK Salary Benchmark", salary_range)
-                    st.caption("Estimated salary range")
+                render_dashboard_metrics(gemini_analysis)
                 
                 st.markdown("---")
                 
@@ -2144,8 +2391,7 @@ Format the cover letter as a proper business letter with appropriate spacing and
                 
                 st.markdown("---")
                 if st.button("💾 Save to Profile", type="primary", use_container_width=True, key="save_to_profile"):
-                    supabase = get_supabase_client()
-                    user_email = st.session_state.get('user_email') or get_user_email_from_database(supabase, username)
+                    user_email = st.session_state.get('user_email') or get_user_email_from_database(username)
                     
                     if not supabase:
                         st.error("❌ Database connection failed. Please check your configuration.")
@@ -2164,8 +2410,7 @@ Format the cover letter as a proper business letter with appropriate spacing and
                         )
                         
                         if save_success:
-                            # Clear cache so new analysis appears in history immediately
-                            fetch_user_history.clear(user_email)
+                            # The saved row is already in the session's history (apply_history_insert)
                             st.toast("✅ Analysis saved to your profile!", icon="✅")
                             st.success("✅ Analysis saved to your profile!")
                         else:
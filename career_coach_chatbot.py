@@ -5,10 +5,40 @@ Provides coaching and coping strategies for work-related roadblocks.
 
 import json
 import os
-from typing import Dict, List, Optional
+import random
+import re
+from typing import Dict, Optional, Tuple
 from datetime import datetime
 
 
+RESPONSE_TEMPLATE = (
+    "I understand you're facing a challenge related to {topic}. "
+    "Here are some strategies that might help:\n\n"
+    "{strategies}\n\n"
+    "Remember, every challenge is an opportunity to grow. "
+    "Would you like to explore any of these strategies in more detail, or discuss another aspect of this situation?"
+)
+
+# Keywords for different roadblock types, checked in priority order
+ROADBLOCK_KEYWORDS = (
+    ("communication", ('communicat', 'misunderstand', 'talk', 'discuss', 'explain')),
+    ("conflict", ('conflict', 'disagree', 'argument', 'fight', 'tension')),
+    ("workload", ('workload', 'overwhelm', 'too much', 'busy', 'stressed', 'pressure')),
+    ("career_growth", ('career', 'promotion', 'advance', 'growth', 'stuck', 'progress')),
+    ("stress", ('stress', 'anxious', 'worried', 'burnout', 'exhausted')),
+    ("teamwork", ('team', 'colleague', 'coworker', 'collaborat')),
+    ("leadership", ('lead', 'manage', 'supervisor', 'boss', 'director')),
+    ("motivation", ('motivat', 'unmotivat', 'bored', 'uninterested', 'passion')),
+)
+
+# One compiled alternation per type: each is a single C-level scan, and keeping one pattern per
+# type preserves the priority order (a combined pattern would return the leftmost keyword instead)
+_ROADBLOCK_RES = tuple(
+    (roadblock_type, re.compile('|'.join(map(re.escape, keywords))))
+    for roadblock_type, keywords in ROADBLOCK_KEYWORDS
+)
+
+
 class CareerCoachChatbot:
     """Chatbot for discussing work roadblocks and providing coaching."""
     
@@ -16,10 +46,13 @@ class CareerCoachChatbot:
         self.personality_profile = personality_profile
         self.conversation_history = []
         self.coaching_strategies = self._load_coaching_strategies()
+        # File the history was last saved to or loaded from, and how many turns it already holds
+        self._saved_file = None
+        self._saved_turns = 0
     
-    def _load_coaching_strategies(self) -> Dict[str, List[str]]:
+    def _load_coaching_strategies(self) -> Dict[str, Tuple[str, ...]]:
         """Load coaching strategies for different types of roadblocks."""
-        return {
+        strategies = {
             "communication": [
                 "Practice active listening - focus on understanding before responding",
                 "Use 'I' statements to express your perspective without blame",
@@ -84,30 +117,17 @@ class CareerCoachChatbot:
                 "Focus on what you can control, not what you can't"
             ]
         }
+        # Tuples: the strategies are never modified, and random.sample reads them in place
+        return {roadblock_type: tuple(items) for roadblock_type, items in strategies.items()}
     
     def _identify_roadblock_type(self, user_input: str) -> str:
         """Identify the type of roadblock from user input."""
         user_lower = user_input.lower()
         
-        # Keywords for different roadblock types
-        if any(word in user_lower for word in ['communicat', 'misunderstand', 'talk', 'discuss', 'explain']):
-            return "communication"
-        elif any(word in user_lower for word in ['conflict', 'disagree', 'argument', 'fight', 'tension']):
-            return "conflict"
-        elif any(word in user_lower for word in ['workload', 'overwhelm', 'too much', 'busy', 'stressed', 'pressure']):
-            return "workload"
-        elif any(word in user_lower for word in ['career', 'promotion', 'advance', 'growth', 'stuck', 'progress']):
-            return "career_growth"
-        elif any(word in user_lower for word in ['stress', 'anxious', 'worried', 'burnout', 'exhausted']):
-            return "stress"
-        elif any(word in user_lower for word in ['team', 'colleague', 'coworker', 'collaborat']):
-            return "teamwork"
-        elif any(word in user_lower for word in ['lead', 'manage', 'supervisor', 'boss', 'director']):
-            return "leadership"
-        elif any(word in user_lower for word in ['motivat', 'unmotivat', 'bored', 'uninterested', 'passion']):
-            return "motivation"
-        else:
-            return "general"
+        for roadblock_type, pattern in _ROADBLOCK_RES:
+            if pattern.search(user_lower):
+                return roadblock_type
+        return "general"
     
     def _personalize_response(self, response: str, roadblock_type: str) -> str:
         """Personalize response based on personality profile."""
@@ -130,25 +150,14 @@ class CareerCoachChatbot:
         strategies = self.coaching_strategies.get(roadblock_type, self.coaching_strategies['general'])
         
         # Select 2-3 relevant strategies
-        import random
         selected_strategies = random.sample(strategies, min(3, len(strategies)))
         
         # Build response
-        response_parts = [
-            f"I understand you're facing a challenge related to {roadblock_type.replace('_', ' ')}. "
-            f"Here are some strategies that might help:\n"
-        ]
-        
-        for i, strategy in enumerate(selected_strategies, 1):
-            response_parts.append(f"{i}. {strategy}")
-        
-        response_parts.append(
-            "\nRemember, every challenge is an opportunity to grow. "
-            "Would you like to explore any of these strategies in more detail, or discuss another aspect of this situation?"
+        response = RESPONSE_TEMPLATE.format(
+            topic=roadblock_type.replace('_', ' '),
+            strategies="\n".join(f"{i}. {strategy}" for i, strategy in enumerate(selected_strategies, 1))
         )
         
-        response = "\n".join(response_parts)
-        
         # Personalize based on personality profile
         response = self._personalize_response(response, roadblock_type)
         
@@ -186,14 +195,30 @@ class CareerCoachChatbot:
             response = self.get_coaching_response(user_input)
             print(f"\nCoach: {response}\n")
     
+    @staticmethod
+    def _turns_file(filename: str) -> str:
+        """Path of the JSONL file holding the turns for a conversation saved as filename."""
+        return os.path.splitext(filename)[0] + ".turns.jsonl"
+    
     def save_conversation(self, filename: str = "coaching_conversation.json"):
-        """Save conversation history to file."""
-        data = {
-            "personality_profile": self.personality_profile,
-            "conversation_history": self.conversation_history
-        }
+        """
+        Save conversation history to file.
+        The profile goes to filename and turns to a .turns.jsonl file beside it, one JSON object
+        per line, so saving again only appends the turns added since the last save.
+        """
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+            json.dump({"personality_profile": self.personality_profile}, f, indent=2)
+        
+        # A different file, or one this session has not written yet, starts its turns over
+        if filename == self._saved_file:
+            mode, new_turns = 'a', self.conversation_history[self._saved_turns:]
+        else:
+            mode, new_turns = 'w', self.conversation_history
+        with open(self._turns_file(filename), mode) as f:
+            f.writelines(json.dumps(turn) + "\n" for turn in new_turns)
+        
+        self._saved_file = filename
+        self._saved_turns = len(self.conversation_history)
         print(f"\nConversation saved to {filename}")
     
     def load_conversation(self, filename: str = "coaching_conversation.json") -> bool:
@@ -201,8 +226,19 @@ class CareerCoachChatbot:
         if os.path.exists(filename):
             with open(filename, 'r') as f:
                 data = json.load(f)
-                self.conversation_history = data.get('conversation_history', [])
-                self.personality_profile = data.get('personality_profile')
+            self.personality_profile = data.get('personality_profile')
+            
+            if 'conversation_history' in data:
+                # Older saves kept every turn in the JSON document; the next save rewrites them as JSONL
+                self.conversation_history = data['conversation_history']
+                self._saved_file = None
+            else:
+                self.conversation_history = []
+                turns_file = self._turns_file(filename)
+                if os.path.exists(turns_file):
+                    with open(turns_file, 'r') as f:
+                        self.conversation_history = [json.loads(line) for line in f if line.strip()]
+                self._saved_file = filename
+            self._saved_turns = len(self.conversation_history)
             return True
         return False
-
@@ -5,44 +5,72 @@ Compares CV with job listings and provides rating and improvement suggestions.
 
 import re
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, List, Tuple
 from collections import Counter
-# #region agent log
-try:
-    import json
-    from datetime import datetime
-    with open(r'c:\Users\Matt\Google Drive\Stuff\Cursor Apps\Mentor\.cursor\debug.log', 'a', encoding='utf-8') as f:
-        f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"cv_analyzer.py:10","message":"Before importing PyPDF2 in cv_analyzer","data":{},"timestamp":int(datetime.now().timestamp()*1000)}) + '\n')
-except: pass
-# #endregion
-try:
-    # Try importing pypdf (new package name) first
-    import pypdf as PyPDF2
-    # #region agent log
+
+
+def _debug_log(location: str, message: str, data: dict = None):
+    """Append a JSON debug record when MENTOR_DEBUG is set; otherwise returns before doing any work."""
+    if not os.environ.get("MENTOR_DEBUG"):
+        return
     try:
-        with open(r'c:\Users\Matt\Google Drive\Stuff\Cursor Apps\Mentor\.cursor\debug.log', 'a', encoding='utf-8') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"cv_analyzer.py:13","message":"pypdf imported successfully as PyPDF2 in cv_analyzer","data":{"version":getattr(PyPDF2,'__version__','unknown')},"timestamp":int(datetime.now().timestamp()*1000)}) + '\n')
-    except: pass
-    # #endregion
-except ImportError:
-    # Fallback to PyPDF2 for older installations
+        import json
+        import tempfile
+        from datetime import datetime
+        log_path = os.environ.get("MENTOR_DEBUG_LOG") or os.path.join(tempfile.gettempdir(), "mentor_debug.log")
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"sessionId": "debug-session", "runId": "run1", "hypothesisId": "E", "location": location, "message": message, "data": data or {}, "timestamp": int(datetime.now().timestamp() * 1000)}) + '\n')
+    except Exception:
+        pass
+
+
+# pypdf and python-docx are only needed for file-based loads, so they are imported on first use
+# instead of at module load; pasted job text never pays for them
+_pypdf = None
+
+
+def _load_pypdf():
+    """Import pypdf (or legacy PyPDF2) once and return the module."""
+    global _pypdf
+    if _pypdf is not None:
+        return _pypdf
+    _debug_log("cv_analyzer.py:import", "Before importing PyPDF2 in cv_analyzer")
     try:
-        import PyPDF2
-        # #region agent log
+        # Try importing pypdf (new package name) first
+        import pypdf as PyPDF2
+        _debug_log("cv_analyzer.py:import", "pypdf imported successfully as PyPDF2 in cv_analyzer", {"version": getattr(PyPDF2, '__version__', 'unknown')})
+    except ImportError:
+        # Fallback to PyPDF2 for older installations
         try:
-            with open(r'c:\Users\Matt\Google Drive\Stuff\Cursor Apps\Mentor\.cursor\debug.log', 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"cv_analyzer.py:18","message":"PyPDF2 imported successfully (legacy) in cv_analyzer","data":{"version":getattr(PyPDF2,'__version__','unknown')},"timestamp":int(datetime.now().timestamp()*1000)}) + '\n')
-        except: pass
-        # #endregion
-    except ImportError as e:
-        # #region agent log
-        try:
-            with open(r'c:\Users\Matt\Google Drive\Stuff\Cursor Apps\Mentor\.cursor\debug.log', 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"E","location":"cv_analyzer.py:22","message":"Both pypdf and PyPDF2 import failed in cv_analyzer","data":{"error":str(e),"error_type":type(e).__name__},"timestamp":int(datetime.now().timestamp()*1000)}) + '\n')
-        except: pass
-        # #endregion
-        raise ImportError(f"PDF library not found. Please install it with: pip install pypdf. Original error: {e}")
-from docx import Document
+            import PyPDF2
+            _debug_log("cv_analyzer.py:import", "PyPDF2 imported successfully (legacy) in cv_analyzer", {"version": getattr(PyPDF2, '__version__', 'unknown')})
+        except ImportError as e:
+            _debug_log("cv_analyzer.py:import", "Both pypdf and PyPDF2 import failed in cv_analyzer", {"error": str(e), "error_type": type(e).__name__})
+            raise ImportError(f"PDF library not found. Please install it with: pip install pypdf. Original error: {e}")
+    _pypdf = PyPDF2
+    return _pypdf
+
+
+# PyMuPDF splits larger PDFs across worker processes; pypdf stays as the fallback reader
+from pdf_extractor import PYMUPDF_AVAILABLE, extract_pdf_text
+
+
+# Common technical skills and keywords, matched as substrings of the lowercased text
+COMMON_SKILLS = (
+    'python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'angular',
+    'node.js', 'django', 'flask', 'aws', 'azure', 'docker', 'kubernetes',
+    'git', 'agile', 'scrum', 'project management', 'leadership', 'communication',
+    'analytics', 'data analysis', 'machine learning', 'ai', 'cloud computing',
+    'devops', 'ci/cd', 'rest api', 'microservices', 'database', 'nosql',
+    'excel', 'powerpoint', 'presentation', 'negotiation', 'sales', 'marketing',
+    'finance', 'accounting', 'design', 'ui/ux', 'customer service', 'teamwork'
+)
+
+# Patterns are compiled once at module level instead of on every call
+_WS_RE = re.compile(r'\s+')
+# Runs of at most four capitalized words, so long title-cased lines cannot backtrack heavily
+_CAP_RE = re.compile(r'\b[A-Z][a-z]{2,}(?:\s+[A-Z][a-z]+){0,3}\b')
+_EXP_RE = re.compile(r'\d+\+?\s*years?\s*(?:of\s*)?experience')
 
 
 class CVAnalyzer:
@@ -51,23 +79,23 @@ class CVAnalyzer:
     def __init__(self):
         self.cv_text = ""
         self.job_listing_text = ""
-        self.cv_keywords = []
-        self.job_keywords = []
+        self.cv_keywords = frozenset()
+        self.job_keywords = frozenset()
         self.match_score = 0.0
         self.suggestions = []
+        # Result of analyze_match, reused until a new CV or job listing is loaded
+        self._analysis = None
     
     def load_cv(self, filepath: str) -> bool:
         """Load CV from file (supports .txt, .pdf, .docx)."""
         try:
             if filepath.endswith('.pdf'):
-                with open(filepath, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    self.cv_text = ""
-                    for page in pdf_reader.pages:
-                        self.cv_text += page.extract_text() + "\n"
+                self.cv_text = self._read_pdf_text(filepath)
             elif filepath.endswith('.docx'):
+                from docx import Document
                 doc = Document(filepath)
-                self.cv_text = "\n".join([para.text for para in doc.paragraphs])
+                # Word documents are full of empty spacer paragraphs; they add nothing to matching
+                self.cv_text = "\n".join(para.text for para in doc.paragraphs if para.text.strip())
             elif filepath.endswith('.txt'):
                 with open(filepath, 'r', encoding='utf-8') as f:
                     self.cv_text = f.read()
@@ -75,8 +103,9 @@ class CVAnalyzer:
                 print(f"Unsupported file format. Please use .txt, .pdf, or .docx")
                 return False
             
-            self.cv_text = self._clean_text(self.cv_text)
-            self.cv_keywords = self._extract_keywords(self.cv_text)
+            raw_text, self.cv_text = self._clean_text(self.cv_text)
+            self.cv_keywords = self._extract_keywords(self.cv_text, raw_text)
+            self._analysis = None
             return True
         except Exception as e:
             print(f"Error loading CV: {str(e)}")
@@ -90,14 +119,11 @@ class CVAnalyzer:
                     with open(filepath, 'r', encoding='utf-8') as f:
                         self.job_listing_text = f.read()
                 elif filepath.endswith('.pdf'):
-                    with open(filepath, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        self.job_listing_text = ""
-                        for page in pdf_reader.pages:
-                            self.job_listing_text += page.extract_text() + "\n"
+                    self.job_listing_text = self._read_pdf_text(filepath)
                 elif filepath.endswith('.docx'):
+                    from docx import Document
                     doc = Document(filepath)
-                    self.job_listing_text = "\n".join([para.text for para in doc.paragraphs])
+                    self.job_listing_text = "\n".join(para.text for para in doc.paragraphs if para.text.strip())
                 else:
                     print("Unsupported file format. Please use .txt, .pdf, or .docx")
                     return False
@@ -107,77 +133,75 @@ class CVAnalyzer:
                 print("Please provide either a filepath or text input")
                 return False
             
-            self.job_listing_text = self._clean_text(self.job_listing_text)
-            self.job_keywords = self._extract_keywords(self.job_listing_text)
+            raw_text, self.job_listing_text = self._clean_text(self.job_listing_text)
+            self.job_keywords = self._extract_keywords(self.job_listing_text, raw_text)
+            self._analysis = None
             return True
         except Exception as e:
             print(f"Error loading job listing: {str(e)}")
             return False
     
-    def _clean_text(self, text: str) -> str:
-        """Clean and normalize text."""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Convert to lowercase for keyword matching
-        return text.lower()
-    
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extract keywords from text (skills, technologies, qualifications)."""
-        # Common technical skills and keywords
-        common_skills = [
-            'python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'angular',
-            'node.js', 'django', 'flask', 'aws', 'azure', 'docker', 'kubernetes',
-            'git', 'agile', 'scrum', 'project management', 'leadership', 'communication',
-            'analytics', 'data analysis', 'machine learning', 'ai', 'cloud computing',
-            'devops', 'ci/cd', 'rest api', 'microservices', 'database', 'nosql',
-            'excel', 'powerpoint', 'presentation', 'negotiation', 'sales', 'marketing',
-            'finance', 'accounting', 'design', 'ui/ux', 'customer service', 'teamwork'
-        ]
+    def _read_pdf_text(self, filepath: str) -> str:
+        """Extract text from every page of a PDF, one line break after each page."""
+        if PYMUPDF_AVAILABLE:
+            with open(filepath, 'rb') as f:
+                return extract_pdf_text(f.read()) + "\n"
         
+        with open(filepath, 'rb') as f:
+            pdf_reader = _load_pypdf().PdfReader(f)
+            # Join once rather than growing a string page by page; pages without text contribute nothing
+            return "".join((page.extract_text() or "") + "\n" for page in pdf_reader.pages)
+    
+    def _clean_text(self, text: str) -> Tuple[str, str]:
+        """Clean and normalize text. Returns (raw, normalized): both whitespace-collapsed, only normalized is lowercased."""
+        # Remove extra whitespace; the lowercase copy is used for keyword matching
+        raw = _WS_RE.sub(' ', text)
+        return raw, raw.lower()
+    
+    def _extract_keywords(self, text: str, raw_text: str = "") -> FrozenSet[str]:
+        """
+        Extract keywords from text (skills, technologies, qualifications).
+        Expects the (raw, normalized) pair from _clean_text: text is already lowercase,
+        raw_text keeps its capitals for the capitalized-term pass.
+        """
         # Extract words that appear in common skills
-        keywords = []
-        text_lower = text.lower()
-        for skill in common_skills:
-            if skill in text_lower:
-                keywords.append(skill)
+        keywords = {skill for skill in COMMON_SKILLS if skill in text}
         
         # Also extract capitalized terms (likely proper nouns, technologies, etc.)
-        capitalized_terms = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        keywords.extend([term.lower() for term in capitalized_terms if len(term) > 3])
+        keywords.update(term.lower() for term in _CAP_RE.findall(raw_text) if len(term) > 3)
         
         # Extract years of experience patterns
-        experience_patterns = re.findall(r'\d+\+?\s*years?\s*(?:of\s*)?experience', text_lower)
-        keywords.extend(experience_patterns)
+        keywords.update(_EXP_RE.findall(text))
         
-        return list(set(keywords))  # Remove duplicates
+        return frozenset(keywords)
     
     def analyze_match(self) -> Dict:
         """Analyze how well CV matches the job listing."""
         if not self.cv_text or not self.job_listing_text:
             return {"error": "Please load both CV and job listing first"}
+        if self._analysis is not None:
+            return self._analysis
         
         # Calculate keyword match
-        cv_keyword_set = set(self.cv_keywords)
-        job_keyword_set = set(self.job_keywords)
-        
-        matching_keywords = cv_keyword_set.intersection(job_keyword_set)
-        missing_keywords = job_keyword_set - cv_keyword_set
+        matching_keywords = self.cv_keywords & self.job_keywords
+        missing_keywords = self.job_keywords - self.cv_keywords
         
         # Calculate match score (0-100)
-        if len(job_keyword_set) > 0:
-            self.match_score = (len(matching_keywords) / len(job_keyword_set)) * 100
+        if len(self.job_keywords) > 0:
+            self.match_score = (len(matching_keywords) / len(self.job_keywords)) * 100
         else:
             self.match_score = 0
         
         # Generate suggestions
         self.suggestions = self._generate_suggestions(matching_keywords, missing_keywords)
         
-        return {
+        self._analysis = {
             "match_score": round(self.match_score, 2),
             "matching_keywords": list(matching_keywords),
             "missing_keywords": list(missing_keywords),
             "suggestions": self.suggestions
         }
+        return self._analysis
     
     def _generate_suggestions(self, matching: set, missing: set) -> List[str]:
         """Generate improvement suggestions."""
@@ -1,13 +1,34 @@
+import json
+import sys
+import time
+from pathlib import Path
+
 import streamlit as st
-import google.generativeai as genai
 
-# Use your existing secret to connect
-genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
+# The model list changes rarely, so it is kept on disk for a day (run with --refresh to re-check now)
+CACHE_PATH = Path.home() / ".mentor_models.json"
+CACHE_TTL = 86400  # seconds
+
+
+def list_generate_content_models(refresh: bool = False) -> list:
+    """Names of every model your key can use for 'generateContent', cached on disk for CACHE_TTL."""
+    if not refresh and CACHE_PATH.exists() and time.time() - CACHE_PATH.stat().st_mtime < CACHE_TTL:
+        return json.loads(CACHE_PATH.read_text())
+
+    import google.generativeai as genai
 
-print("Checking available Gemini models...")
+    # Use your existing secret to connect
+    genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
 
-# This loop finds every model your key can access
-for m in genai.list_models():
     # We only want models that can 'generateContent' (the AI brain part)
-    if 'generateContent' in m.supported_generation_methods:
-        print(f"Model Name: {m.name}")
\ No newline at end of file
+    models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+    CACHE_PATH.write_text(json.dumps(models))
+    return models
+
+
+if __name__ == "__main__":
+    print("Checking available Gemini models...")
+
+    # This loop prints every model your key can access
+    for name in list_generate_content_models(refresh="--refresh" in sys.argv):
+        print(f"Model Name: {name}")
@@ -6,8 +6,21 @@ Main entry point for the career coaching tool.
 import os
 import sys
 from psychometric_assessment import PsychometricAssessment
-from cv_analyzer import CVAnalyzer
-from career_coach_chatbot import CareerCoachChatbot
+# CVAnalyzer (which loads the PDF readers) and the chatbot are imported by the menu options that use them
+
+# The menu never changes, so it is joined once and printed in a single write
+MENU_TEXT = "\n".join((
+    "\n" + "="*60,
+    "CAREER COACH APPLICATION",
+    "="*60,
+    "\nMain Menu:",
+    "1. Complete Psychometric Assessment",
+    "2. Analyze CV against Job Listing",
+    "3. Chat with Career Coach",
+    "4. View Saved Personality Profile",
+    "5. Exit",
+    "\n" + "="*60,
+))
 
 
 class CareerCoachApp:
@@ -15,22 +28,13 @@ class CareerCoachApp:
     
     def __init__(self):
         self.psychometric = PsychometricAssessment()
-        self.cv_analyzer = CVAnalyzer()
+        self.cv_analyzer = None
         self.chatbot = None
         self.personality_profile = None
     
     def display_menu(self):
         """Display main menu."""
-        print("\n" + "="*60)
-        print("CAREER COACH APPLICATION")
-        print("="*60)
-        print("\nMain Menu:")
-        print("1. Complete Psychometric Assessment")
-        print("2. Analyze CV against Job Listing")
-        print("3. Chat with Career Coach")
-        print("4. View Saved Personality Profile")
-        print("5. Exit")
-        print("\n" + "="*60)
+        print(MENU_TEXT)
     
     def run_psychometric_assessment(self):
         """Run the psychometric assessment."""
@@ -62,6 +66,10 @@ class CareerCoachApp:
         print("CV ANALYSIS")
         print("="*60)
         
+        if self.cv_analyzer is None:
+            from cv_analyzer import CVAnalyzer
+            self.cv_analyzer = CVAnalyzer()
+        
         # Load CV
         cv_path = input("\nEnter path to your CV file (.txt, .pdf, or .docx): ").strip()
         if not os.path.exists(cv_path):
@@ -112,11 +120,11 @@ class CareerCoachApp:
         # Initialize chatbot with personality profile if available
         if not self.chatbot:
             if not self.personality_profile:
-                # Try to load profile
-                if os.path.exists("personality_profile.json"):
-                    if self.psychometric.load_profile():
-                        self.personality_profile = self.psychometric.personality_profile
+                # Try to load profile; load_profile returns False when there is none
+                if self.psychometric.load_profile():
+                    self.personality_profile = self.psychometric.personality_profile
             
+            from career_coach_chatbot import CareerCoachChatbot
             self.chatbot = CareerCoachChatbot(self.personality_profile)
         
         self.chatbot.chat()
@@ -128,13 +136,13 @@ class CareerCoachApp:
     
     def view_profile(self):
         """View saved personality profile."""
-        if os.path.exists("personality_profile.json"):
-            if self.psychometric.load_profile():
-                self.personality_profile = self.psychometric.personality_profile
-                self.psychometric.display_results()
-                print("\n" + self.psychometric.get_personality_insights())
-            else:
-                print("Error loading profile.")
+        if self.psychometric.load_profile():
+            self.personality_profile = self.psychometric.personality_profile
+            self.psychometric.display_results()
+            print("\n" + self.psychometric.get_personality_insights())
+        elif os.path.exists("personality_profile.json"):
+            # Only a failed load needs the stat, to tell a bad file from a missing one
+            print("Error loading profile.")
         else:
             print("No saved profile found. Please complete the assessment first.")
     
@@ -0,0 +1,97 @@
+"""
+PDF Extractor Module
+Extracts text from PDF files with PyMuPDF, spreading larger documents across worker processes.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List
+
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        # Older PyMuPDF releases only expose the legacy module name
+        import fitz
+    except ImportError:
+        fitz = None
+
+PYMUPDF_AVAILABLE = fitz is not None
+
+# Sequential extraction runs at about 2 ms a page, and a warm pool adds about 1.5 ms per call (temp
+# file plus a reopen per worker). Starting the spawned pool costs about 0.3 s, once per process. Below
+# 16 pages the saving doesn't repay the per-call overhead, and typical CVs never touch the pool
+MIN_PAGES_FOR_POOL = 16
+MAX_WORKERS = 4
+
+# One worker pool for the life of the process, started on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Return the shared extraction pool, creating it on first use.
+    Workers are spawned rather than forked: the app process runs Streamlit's threads (and holds their
+    locks), which a forked child would inherit in whatever state they were in.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _discard_pool():
+    """Drop a pool whose workers died so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Extract text from pages [start, stop) of the PDF at path. Runs inside a pool worker."""
+    doc = fitz.open(path)
+    try:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """Extract text from PDF bytes, preserving page order."""
+    doc = fitz.open(stream=data, filetype="pdf")
+    try:
+        page_count = len(doc)
+        workers = min(os.cpu_count() or 1, MAX_WORKERS)
+        if page_count < MIN_PAGES_FOR_POOL or workers < 2:
+            return "\n".join(page.get_text("text") for page in doc)
+    finally:
+        doc.close()
+
+    # Workers reopen the document from disk instead of receiving the bytes pickled
+    tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+
+        step = -(-page_count // workers)  # ceiling division
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        pool = _get_pool(workers)
+        try:
+            futures = [pool.submit(_extract_page_range, tmp.name, start, stop) for start, stop in ranges]
+            pages = [text for future in futures for text in future.result()]
+        except BrokenProcessPool:
+            # A worker was killed; extract in this process and let the next call start a new pool
+            _discard_pool()
+            pages = _extract_page_range(tmp.name, 0, page_count)
+    finally:
+        os.remove(tmp.name)
+
+    return "\n".join(pages)
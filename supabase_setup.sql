@@ -0,0 +1,76 @@
+-- Supabase setup for Career Coach
+-- Run in the Supabase SQL editor. Statements are idempotent and can be re-run safely.
+
+-- One read path over every user table schema, so the app loads users in a single query.
+-- Drop the branch for any table that does not exist in your project.
+-- The view exposes password hashes: security_invoker keeps the base tables' row-level security in force
+-- (Postgres 15+), and the public API roles get no access, so only the service role can read it.
+-- source_table names the table each row came from, so password updates go back to that table.
+CREATE OR REPLACE VIEW user_directory WITH (security_invoker = true) AS
+    SELECT username, name, password_hash, email, 'user_profiles'::text AS source_table FROM user_profiles
+    UNION ALL
+    SELECT username, full_name AS name, password_hash, email, 'user_accounts'::text AS source_table FROM user_accounts
+    UNION ALL
+    SELECT username, name, password AS password_hash, email, 'users'::text AS source_table FROM users;
+REVOKE ALL ON user_directory FROM anon, authenticated;
+
+-- Login matches usernames case-insensitively with ILIKE; a trigram index keeps that an index scan.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS user_profiles_username_trgm_idx ON user_profiles USING gin (username gin_trgm_ops);
+
+-- Single-user lookup over every schema in one round trip, used for login and email lookup.
+CREATE INDEX IF NOT EXISTS user_profiles_username_lower_idx ON user_profiles (lower(username));
+
+-- Runs as its owner so it can read user_directory regardless of row-level security; the empty
+-- search_path stops callers from substituting their own objects for the view.
+-- Dropped first because CREATE OR REPLACE cannot change the returned columns of an older version.
+DROP FUNCTION IF EXISTS get_user(text);
+CREATE FUNCTION get_user(p_username text)
+RETURNS TABLE (username text, name text, password_hash text, email text, source_table text)
+LANGUAGE sql STABLE
+SECURITY DEFINER
+SET search_path = ''
+AS $$
+    SELECT d.username, d.name, d.password_hash, d.email, d.source_table
+    FROM public.user_directory d
+    WHERE lower(d.username) = lower(p_username)
+    LIMIT 1;
+$$;
+-- It returns password hashes, so like the view it is closed to the public API roles (functions are
+-- executable by PUBLIC by default). The app must connect with the service role key on the server.
+REVOKE EXECUTE ON FUNCTION get_user(text) FROM public, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_user(text) TO service_role;
+
+-- Columns of the given tables, so the app detects its user table schema with one query instead of probing.
+CREATE OR REPLACE FUNCTION get_columns(tbls text[])
+RETURNS TABLE (table_name text, column_name text)
+LANGUAGE sql STABLE
+AS $$
+    SELECT c.table_name::text, c.column_name::text
+    FROM information_schema.columns c
+    WHERE c.table_schema = 'public' AND c.table_name = ANY (tbls);
+$$;
+
+-- Registration inserts with ON CONFLICT (username) DO NOTHING, which needs a unique username on
+-- whichever user table the app detects. Tables that don't exist in your project are skipped.
+-- Adding the constraint fails if a table already holds duplicate usernames; dedupe those first.
+-- Without it the app falls back to a check-then-insert.
+DO $$
+DECLARE
+    tbl text;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['user_profiles', 'user_accounts', 'users'] LOOP
+        IF to_regclass('public.' || tbl) IS NOT NULL
+           AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = tbl || '_username_key') THEN
+            EXECUTE format('ALTER TABLE public.%I ADD CONSTRAINT %I UNIQUE (username)', tbl, tbl || '_username_key');
+        END IF;
+    END LOOP;
+END
+$$;
+
+-- The history sidebar filters by user_email and orders by created_at. INCLUDE covers the listed columns,
+-- so the page query is an index-only scan. Drop display_name from INCLUDE if that column doesn't exist.
+-- On a large live table, run this alone as CREATE INDEX CONCURRENTLY (it cannot run inside a transaction).
+CREATE INDEX IF NOT EXISTS idx_career_history_email_created
+    ON career_history (user_email, created_at DESC)
+    INCLUDE (id, job_title, company_name, match_score, display_name);